@@ -0,0 +1,56 @@
+"""
+Measures the time and memory needed to wrap loaded rows into models.
+
+    python benchmarks/model_build.py [rows]
+"""
+import sys
+import time
+import tracemalloc
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from flaskteroids import registry
+from flaskteroids.model import Model, init, _build
+
+Base = declarative_base()
+
+
+class PostBase(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer(), primary_key=True)
+    title = Column(String())
+    body = Column(String())
+
+
+class Post(Model):
+    pass
+
+
+def main(rows):
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    registry.get(Model)['models'] = {'Post': Post}
+    registry.get(Post)['base_class'] = PostBase
+    init(Post)
+    session = sessionmaker(bind=engine)()
+    session.add_all([PostBase(title=f'title {i}', body='body') for i in range(rows)])
+    session.commit()
+    loaded = session.query(PostBase).all()
+
+    start = time.perf_counter()
+    [_build(Post, r) for r in loaded]
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    models = [_build(Post, r) for r in loaded]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    [m.title for m in models]
+    print(f'rows: {rows}')
+    print(f'time per row: {elapsed / rows * 1e6:.2f} us')
+    print(f'memory per row: {current / rows:.0f} bytes')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
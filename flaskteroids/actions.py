@@ -26,30 +26,35 @@ def get_actions(cls):
 
 
 def decorate_action(cls, action_fn):
+    # Callback chains are resolved once, rules must be already bound to cls
+    before_action, around_action, after_action = _compile_callbacks(cls, action_fn.__name__)
+
     @wraps(action_fn)
     def wrapper(*args, **kwargs):
-        ns = registry.get(cls)
-        before_action = [getattr(cls, ba) for ba in ns.get('before_action', {}).get(action_fn.__name__, [])]
         for ba in before_action:
             res = ba(*args, **kwargs)
             if res:
                 return res
-        around_action = [
-            getattr(cls, aa)(*args, **kwargs)
-            for aa in ns.get('around_action', {}).get(action_fn.__name__, [])
-        ]
-        for aa in around_action:
+        around = [aa(*args, **kwargs) for aa in around_action]
+        for aa in around:
             next(aa)
         res = action_fn(*args, **kwargs)
-        for aa in reversed(around_action):
+        for aa in reversed(around):
             next(aa, None)
-        after_action = [getattr(cls, aa) for aa in ns.get('after_action', {}).get(action_fn.__name__, [])]
         for aa in after_action:
             aa(*args, **kwargs)
         return res
     return wrapper
 
 
+def _compile_callbacks(cls, action_name):
+    ns = registry.get(cls)
+    return tuple(
+        tuple(getattr(cls, name) for name in ns.get(kind, {}).get(action_name, []))
+        for kind in ('before_action', 'around_action', 'after_action')
+    )
+
+
 def before_action(method_name: str, *, only=None):
     def bind(cls):
         if not method_name.startswith('_'):
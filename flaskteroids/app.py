@@ -10,6 +10,8 @@ from flaskteroids.db import session
 from flaskteroids.flash import flash
 from flaskteroids import helpers
 from flaskteroids.csrf import CSRFToken
+from flaskteroids.extensions.cache import CacheExtension
+from flaskteroids.cache.fragments import FragmentCacheExtension
 from flaskteroids.extensions.jobs import JobsExtension
 from flaskteroids.extensions.db import SQLAlchemyExtension
 from flaskteroids.extensions.routes import RoutesExtension
@@ -26,6 +28,7 @@ def create_app(import_name, config=None):
     app.wsgi_app = ProxyFix(app.wsgi_app)
 
     _attach_config(app, config)
+    _setup_cache(app)
     _register_routes(app)
     _configure_orm(app)
     _prepare_shell_context(app)
@@ -56,6 +59,10 @@ def _config(overwrites):
         'MAILERS': {
             'LOCATION': 'app.mailers',
             'SEND_MAILS': False
+        },
+        'CACHE': {
+            'BACKEND': 'inmemory',
+            'OPTIONS': {'max_entries': 10000}
         }
     }
     if overwrites:
@@ -70,6 +77,10 @@ def _attach_config(app, config):
         app.config.update(config)
 
 
+def _setup_cache(app):
+    CacheExtension(app)
+
+
 def _register_routes(app):
     RoutesExtension(app)
 
@@ -97,6 +108,7 @@ def _register_cli_commands(app):
     app.cli.add_command(db_commands.init)
     app.cli.add_command(db_commands.migrate)
     app.cli.add_command(db_commands.rollback)
+    app.cli.add_command(db_commands.reset_counters)
 
 
 def _prepare_shell_context(app):
@@ -130,10 +142,12 @@ def _prepare_template_contexts(app):
     db = app.extensions['flaskteroids.db']
 
     app.jinja_env.globals['render'] = helpers.render
+    app.jinja_env.globals['render_collection'] = helpers.render_collection
     app.jinja_env.globals['button_to'] = helpers.button_to
     app.jinja_env.globals['link_to'] = helpers.link_to
     app.jinja_env.globals['form_with'] = helpers.form_with
     app.jinja_env.globals['csrf_token'] = CSRFToken(app.config.get('SECRET_KEY')).generate
+    app.jinja_env.add_extension(FragmentCacheExtension)
 
     @app.context_processor
     def _():
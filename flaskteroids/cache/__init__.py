@@ -1,17 +1,19 @@
 from flaskteroids.cache.factory import get_cache
 from flaskteroids.cache.base import MISSING
+from flaskteroids.cache.memoize import memoize
 
 
-def value(key: str, ttl=None):
+def value(key, ttl=None, *, stale_ttl=None, single_flight=False, early_expiration=None, lock_timeout=30):
     def wrapper(fn):
-        def decorator(*args, **kwargs):
-            value = fetch(key)
-            if value is not MISSING:
-                return value
-            value = fn(*args, **kwargs)
-            store(key, value, ttl)
-            return value
-        return decorator
+        return memoize(
+            fn,
+            key=key,
+            ttl=ttl,
+            stale_ttl=stale_ttl,
+            single_flight=single_flight,
+            early_expiration=early_expiration,
+            lock_timeout=lock_timeout
+        )
     return wrapper
 
 
@@ -23,5 +25,41 @@ def fetch(key: str):
     return get_cache().fetch(key)
 
 
-def increment(key: str, ttl=None):
-    return get_cache().increment(key, ttl)
+def fetch_multi(keys):
+    return get_cache().fetch_multi(keys)
+
+
+def store_multi(values: dict, ttl=None):
+    get_cache().store_multi(values, ttl)
+
+
+def increment(key: str, ttl=None, amount=1):
+    return get_cache().increment(key, ttl, amount=amount)
+
+
+def decrement(key: str, ttl=None, amount=1):
+    return get_cache().decrement(key, ttl, amount=amount)
+
+
+def add(key: str, value, ttl=None):
+    return get_cache().add(key, value, ttl)
+
+
+def compare_and_set(key: str, expected, value, ttl=None):
+    return get_cache().compare_and_set(key, expected, value, ttl)
+
+
+def compare_and_delete(key: str, expected):
+    return get_cache().compare_and_delete(key, expected)
+
+
+def update_multi(keys, fn):
+    return get_cache().update_multi(keys, fn)
+
+
+def delete(key: str):
+    get_cache().delete(key)
+
+
+def stats():
+    return get_cache().stats()
@@ -1 +1,73 @@
+from abc import ABC, abstractmethod
+
 MISSING = object()
+
+
+class Cache(ABC):
+
+    @abstractmethod
+    def store(self, key: str, value, ttl=None):
+        pass
+
+    @abstractmethod
+    def fetch(self, key: str):
+        pass
+
+    def fetch_multi(self, keys) -> dict:
+        """Returns a dict with the values of the keys that are present"""
+        values = {k: self.fetch(k) for k in keys}
+        return {k: v for k, v in values.items() if v is not MISSING}
+
+    def store_multi(self, values: dict, ttl=None):
+        for k, v in values.items():
+            self.store(k, v, ttl)
+
+    @abstractmethod
+    def increment(self, key: str, ttl=None, amount=1):
+        pass
+
+    def decrement(self, key: str, ttl=None, amount=1):
+        return self.increment(key, ttl, amount=-amount)
+
+    @abstractmethod
+    def add(self, key: str, value, ttl=None) -> bool:
+        """Stores the value only if the key is not present. Returns whether it was stored"""
+        pass
+
+    @abstractmethod
+    def compare_and_set(self, key: str, expected, value, ttl=None) -> bool:
+        """Stores the value only if the current one is the expected one (MISSING when absent)"""
+        pass
+
+    def compare_and_delete(self, key: str, expected) -> bool:
+        """
+        Deletes the key only if the current value is the expected one. Returns whether it was deleted.
+        This default is not atomic, backends shared between threads or processes should override it.
+        """
+        if not matches(self.fetch(key), expected):
+            return False
+        self.delete(key)
+        return True
+
+    @abstractmethod
+    def update_multi(self, keys, fn):
+        """
+        Atomically updates several keys.
+        fn receives a dict with the current values of keys (MISSING when absent) and
+        returns a tuple (updates, result) where updates is a dict {key: (value, ttl)}
+        with the values to store. Returns result.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+def matches(current, expected):
+    if current is MISSING or expected is MISSING:
+        return current is expected
+    return current == expected
@@ -1,5 +1,53 @@
-import flaskteroids.cache.inmemory as inmemory
+from importlib import import_module
+from flask import current_app, has_app_context
+from flaskteroids.cache.base import Cache
+from flaskteroids.cache.inmemory import InMemoryCache
+from flaskteroids.cache.sqlite import SQLiteCache
+from flaskteroids.exceptions import ProgrammerError
 
 
-def get_cache():
-    return inmemory
+_backends = {
+    'inmemory': InMemoryCache,
+    'sqlite': SQLiteCache,
+}
+
+_default_cache = None
+
+
+def register_backend(name: str, backend_cls):
+    _backends[name] = backend_cls
+
+
+def create_cache(config=None) -> Cache:
+    config = config or {}
+    backend_cls = _resolve_backend(config.get('BACKEND') or 'inmemory')
+    return backend_cls(**(config.get('OPTIONS') or {}))
+
+
+def get_cache() -> Cache:
+    if has_app_context():
+        ext = current_app.extensions.get('flaskteroids.cache')
+        if ext:
+            return ext.cache
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = InMemoryCache()
+    return _default_cache
+
+
+def _resolve_backend(backend):
+    if isinstance(backend, type):
+        backend_cls = backend
+    elif backend in _backends:
+        backend_cls = _backends[backend]
+    elif isinstance(backend, str) and '.' in backend:
+        module_name, _, cls_name = backend.rpartition('.')
+        try:
+            backend_cls = getattr(import_module(module_name), cls_name)
+        except (ImportError, AttributeError):
+            raise ProgrammerError(f'Cache backend <{backend}> could not be imported')
+    else:
+        raise ProgrammerError(f'Cache backend <{backend}> is not registered')
+    if not isinstance(backend_cls, type) or not issubclass(backend_cls, Cache):
+        raise ProgrammerError(f'Cache backend <{backend}> should inherit from {Cache.__name__}')
+    return backend_cls
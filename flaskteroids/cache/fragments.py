@@ -0,0 +1,54 @@
+import hashlib
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+import flaskteroids.cache as cache
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Caches parts of templates:
+
+        {% cache post %}...{% endcache %}
+        {% cache post, 'sidebar', ttl=600 %}...{% endcache %}
+
+    Models are keyed by their cache_key and cache_version, so a fragment is rendered again
+    once its records change. Keys also include a digest of the block, so editing it does too.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        keys = []
+        ttl = nodes.Const(None)
+        while True:
+            if parser.stream.current.test('name:ttl') and parser.stream.look().test('assign'):
+                parser.stream.skip(2)
+                ttl = parser.parse_expression()
+            else:
+                keys.append(parser.parse_expression())
+            if not parser.stream.skip_if('comma'):
+                break
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        digest = hashlib.sha1(f'{parser.name}:{body!r}'.encode()).hexdigest()[:12]
+        call = self.call_method('_cache', [nodes.List(keys), ttl, nodes.Const(digest)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cache(self, keys, ttl, digest, caller):
+        key = '/'.join(['views', digest, *(fragment_key(k) for k in keys)])
+        html = cache.fetch(key)
+        if html is cache.MISSING:
+            html = str(caller())
+            cache.store(key, html, ttl)
+        return Markup(html)
+
+
+def fragment_key(value):
+    if isinstance(value, (list, tuple)):
+        return '/'.join(fragment_key(v) for v in value)
+    cache_key = getattr(value, 'cache_key', None)
+    if cache_key is None:
+        return str(value)
+    version = getattr(value, 'cache_version', None)
+    return f'{cache_key}-{version}' if version else cache_key
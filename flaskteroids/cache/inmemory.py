@@ -1,30 +1,343 @@
+import os
+import sys
 import time
-from flaskteroids.cache.base import MISSING
+import weakref
+import threading
+from contextlib import ExitStack
+from collections import OrderedDict, defaultdict
+from flaskteroids.cache.base import Cache, MISSING, matches
+from flaskteroids.exceptions import ProgrammerError
 
 
-_cache = {}
+class InMemoryCache(Cache):
+    """
+    Process local cache.
+    It can be bounded by number of entries and/or by an estimation of the
+    memory used by them, evicting entries following the given policy (lru/lfu).
+    Expired entries are removed when accessed and periodically by a background sweeper.
+    Keys are spread over shards, each one guarded by its own lock, so concurrent
+    threads only contend when accessing keys in the same shard. Limits and
+    eviction are applied per shard, so values bigger than the bytes limit of a
+    shard (`max_bytes / shards`) are not stored.
+    """
 
+    def __init__(self, max_entries=None, max_bytes=None, policy='lru', sweep_interval=60, shards=16):
+        if policy not in _policies:
+            raise ProgrammerError(f'Cache eviction policy <{policy}> is not supported')
+        self._shards = [
+            _Shard(_split(max_entries, shards), _split(max_bytes, shards), _policies[policy]())
+            for _ in range(shards)
+        ]
+        self._sweep_interval = sweep_interval
+        self._sweeper_pid = None
+        self._sweeper_lock = threading.Lock()
 
-def store(key: str, value, ttl=None):
-    now = time.time()
-    _cache[key] = (value, now + ttl if ttl else None)
+    def store(self, key: str, value, ttl=None):
+        shard = self._shard(key)
+        with shard.lock:
+            shard.set(key, value, ttl)
+        self._ensure_sweeper()
 
+    def fetch(self, key: str):
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.get(key)
 
-def fetch(key: str):
-    now = time.time()
-    cached = _cache.get(key)
+    def fetch_multi(self, keys):
+        res = {}
+        for shard, shard_keys in self._by_shard(keys):
+            with shard.lock:
+                values = {k: shard.get(k) for k in shard_keys}
+            res.update((k, v) for k, v in values.items() if v is not MISSING)
+        return res
 
-    if cached:
-        value, timestamp = cached
-        if not timestamp or now <= timestamp:
-            return value
-    return MISSING
+    def store_multi(self, values, ttl=None):
+        for shard, shard_keys in self._by_shard(values):
+            with shard.lock:
+                for k in shard_keys:
+                    shard.set(k, values[k], ttl)
+        self._ensure_sweeper()
 
+    def increment(self, key: str, ttl=None, amount=1):
+        shard = self._shard(key)
+        with shard.lock:
+            val = shard.get(key)
+            val = (0 if val is MISSING else val) + amount
+            shard.set(key, val, ttl)
+        self._ensure_sweeper()
+        return val
 
-def increment(key: str, ttl=None):
-    val = fetch(key)
-    if val is MISSING:
-        val = 0
-    val += 1
-    store(key, val, ttl)
-    return val
+    def add(self, key: str, value, ttl=None):
+        shard = self._shard(key)
+        with shard.lock:
+            if shard.get(key) is not MISSING:
+                return False
+            shard.set(key, value, ttl)
+        self._ensure_sweeper()
+        return True
+
+    def compare_and_set(self, key: str, expected, value, ttl=None):
+        shard = self._shard(key)
+        with shard.lock:
+            if not matches(shard.get(key), expected):
+                return False
+            shard.set(key, value, ttl)
+        self._ensure_sweeper()
+        return True
+
+    def compare_and_delete(self, key: str, expected):
+        shard = self._shard(key)
+        with shard.lock:
+            if not matches(shard.get(key), expected):
+                return False
+            shard.remove(key)
+        return True
+
+    def update_multi(self, keys, fn):
+        # Locks are always taken in the same order to avoid deadlocks
+        indexes = sorted({self._shard_index(k) for k in keys})
+        with ExitStack() as stack:
+            for i in indexes:
+                stack.enter_context(self._shards[i].lock)
+            updates, result = fn({k: self._shard(k).get(k) for k in keys})
+            for k, (value, ttl) in updates.items():
+                self._shard(k).set(k, value, ttl)
+        if updates:
+            self._ensure_sweeper()
+        return result
+
+    def delete(self, key: str):
+        shard = self._shard(key)
+        with shard.lock:
+            shard.remove(key)
+
+    def sweep(self):
+        return sum(shard.sweep() for shard in self._shards)
+
+    def stats(self):
+        stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'entries': 0, 'bytes': 0}
+        for shard in self._shards:
+            for k, v in shard.stats().items():
+                stats[k] += v
+        return stats
+
+    def _by_shard(self, keys):
+        # Each shard lock is taken once for all of its keys
+        grouped = {}
+        for k in keys:
+            grouped.setdefault(self._shard_index(k), []).append(k)
+        return [(self._shards[i], shard_keys) for i, shard_keys in grouped.items()]
+
+    def _shard(self, key):
+        return self._shards[self._shard_index(key)]
+
+    def _shard_index(self, key):
+        return hash(key) % len(self._shards)
+
+    def _ensure_sweeper(self):
+        if not self._sweep_interval or self._sweeper_pid == os.getpid():
+            return
+        with self._sweeper_lock:
+            if self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+        threading.Thread(
+            target=_sweep_periodically,
+            args=(weakref.ref(self), self._sweep_interval),
+            name='flaskteroids-cache-sweeper',
+            daemon=True
+        ).start()
+
+
+class _Shard:
+    """Entries of a portion of the key space. Callers must hold the lock"""
+
+    def __init__(self, max_entries, max_bytes, policy):
+        self.lock = threading.Lock()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._policy = policy
+        self._entries = {}
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats['misses'] += 1
+            return MISSING
+        if entry.is_expired(time.time()):
+            self.remove(key)
+            self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            return MISSING
+        self._policy.touch(key)
+        self._stats['hits'] += 1
+        return entry.value
+
+    def set(self, key, value, ttl):
+        entry = _Entry(value, time.time() + ttl if ttl else None, _sizeof(key, value))
+        if self._max_bytes is not None and entry.size > self._max_bytes:
+            # Would evict the whole shard and then itself, so it is not stored
+            # at all (dropping any previous value to avoid serving it stale)
+            self.remove(key)
+            return
+        previous = self._entries.get(key)
+        if previous:
+            self._bytes -= previous.size
+            self._policy.touch(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        # New keys are tracked after evicting so they are not chosen as victims
+        self._evict()
+        if not previous:
+            self._policy.add(key)
+            if self._is_full():
+                self.remove(key)
+                self._stats['evictions'] += 1
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry.size
+            self._policy.remove(key)
+
+    def sweep(self):
+        now = time.time()
+        with self.lock:
+            expired = [k for k, e in self._entries.items() if e.is_expired(now)]
+            for key in expired:
+                self.remove(key)
+            self._stats['expirations'] += len(expired)
+        return len(expired)
+
+    def stats(self):
+        with self.lock:
+            return {**self._stats, 'entries': len(self._entries), 'bytes': self._bytes}
+
+    def _evict(self):
+        while self._is_full():
+            victim = self._policy.victim()
+            if victim is None:
+                return
+            self.remove(victim)
+            self._stats['evictions'] += 1
+
+    def _is_full(self):
+        if self._max_entries is not None and len(self._entries) > self._max_entries:
+            return True
+        if self._max_bytes is not None and self._bytes > self._max_bytes:
+            return True
+        return False
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'size')
+
+    def __init__(self, value, expires_at, size):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+    def is_expired(self, now):
+        return bool(self.expires_at) and now > self.expires_at
+
+
+class _LRUPolicy:
+
+    def __init__(self):
+        self._keys = OrderedDict()
+
+    def add(self, key):
+        self._keys[key] = None
+
+    def touch(self, key):
+        self._keys.move_to_end(key)
+
+    def remove(self, key):
+        self._keys.pop(key, None)
+
+    def victim(self):
+        return next(iter(self._keys), None)
+
+
+class _LFUPolicy:
+    """Constant time LFU. Keys with the same frequency are evicted in LRU order"""
+
+    def __init__(self):
+        self._frequencies = {}
+        self._buckets = defaultdict(OrderedDict)
+        self._min_frequency = 0
+
+    def add(self, key):
+        self._frequencies[key] = 1
+        self._buckets[1][key] = None
+        self._min_frequency = 1
+
+    def touch(self, key):
+        frequency = self._frequencies[key]
+        self._unlink(key, frequency)
+        if self._min_frequency == frequency and frequency not in self._buckets:
+            self._min_frequency = frequency + 1
+        self._frequencies[key] = frequency + 1
+        self._buckets[frequency + 1][key] = None
+
+    def remove(self, key):
+        frequency = self._frequencies.pop(key, None)
+        if frequency is not None:
+            self._unlink(key, frequency)
+
+    def victim(self):
+        if not self._buckets:
+            return None
+        if self._min_frequency not in self._buckets:
+            self._min_frequency = min(self._buckets)
+        return next(iter(self._buckets[self._min_frequency]))
+
+    def _unlink(self, key, frequency):
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+
+
+_policies = {
+    'lru': _LRUPolicy,
+    'lfu': _LFUPolicy,
+}
+
+
+def _split(limit, shards):
+    if limit is None:
+        return None
+    return -(-limit // shards)
+
+
+def _sizeof(key, value):
+    return sys.getsizeof(key) + _deep_sizeof(value, set())
+
+
+def _deep_sizeof(obj, seen):
+    # Containers and object attributes are walked, cached values are often wrapped (e.g. in tuples)
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(v, seen) for v in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += _deep_sizeof(vars(obj), seen)
+    return size
+
+
+def _sweep_periodically(cache_ref, interval):
+    # Only a weak reference is kept so the sweeper does not keep alive a discarded cache
+    while True:
+        time.sleep(interval)
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.sweep()
+        del cache
@@ -0,0 +1,127 @@
+import math
+import time
+import uuid
+import random
+import inspect
+import logging
+import threading
+from typing import NamedTuple, Any
+from functools import wraps
+from flask import current_app, has_app_context
+from flaskteroids.cache.factory import get_cache
+from flaskteroids.cache.base import MISSING
+
+_logger = logging.getLogger(__name__)
+
+_WAIT_INTERVAL = 0.05
+
+
+class Entry(NamedTuple):
+    value: Any
+    delta: float
+    expires_at: float | None
+
+
+def memoize(fn, *, key, ttl=None, stale_ttl=None, single_flight=False, early_expiration=None, lock_timeout=30):
+    """
+    Caches the result of fn under key.
+    key can be a template formatted with the call arguments (e.g. 'posts:{user_id}')
+    or a function receiving the call arguments and returning the key.
+    With stale_ttl, values are kept that many seconds after they expire. Those stale
+    values are returned while a single background thread refreshes them.
+    With single_flight only one caller (across threads and processes sharing the cache)
+    computes a missing value, the rest wait for it.
+    With early_expiration (XFetch beta, 1.0 is a good default) callers may recompute the
+    value before it expires, with a probability that grows as the expiration gets closer
+    and with the time it took to compute it, spreading recomputations over time.
+    """
+    signature = inspect.signature(fn)
+
+    def key_for(args, kwargs):
+        if callable(key):
+            return key(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return key.format(*args, **bound.arguments)
+
+    def compute(cache, k, args, kwargs):
+        start = time.monotonic()
+        value = fn(*args, **kwargs)
+        delta = time.monotonic() - start
+        expires_at = time.time() + ttl if ttl else None
+        cache.store(k, Entry(value, delta, expires_at), ttl + (stale_ttl or 0) if ttl else None)
+        return value
+
+    def compute_once(cache, k, entry, args, kwargs):
+        lock_key = f'{k}:lock'
+        token = uuid.uuid4().hex
+        if cache.add(lock_key, token, lock_timeout):
+            try:
+                return compute(cache, k, args, kwargs)
+            finally:
+                # The lock may have expired and been taken by someone else meanwhile
+                cache.compare_and_delete(lock_key, token)
+        if entry is not MISSING:
+            # Someone else is already refreshing it, current value is still valid
+            return entry.value
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(_WAIT_INTERVAL)
+            entry = cache.fetch(k)
+            if entry is not MISSING:
+                return entry.value
+            if cache.fetch(lock_key) is MISSING:
+                break
+        _logger.debug(f'gave up waiting for {k} to be computed')
+        return compute(cache, k, args, kwargs)
+
+    def refresh_in_background(cache, k, args, kwargs):
+        lock_key = f'{k}:lock'
+        token = uuid.uuid4().hex
+        if not cache.add(lock_key, token, lock_timeout):
+            return
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def refresh():
+            try:
+                if app:
+                    with app.app_context():
+                        compute(cache, k, args, kwargs)
+                else:
+                    compute(cache, k, args, kwargs)
+            except Exception:
+                _logger.exception(f'error refreshing stale value for {k}')
+            finally:
+                cache.compare_and_delete(lock_key, token)
+
+        threading.Thread(target=refresh, name='flaskteroids-cache-refresh', daemon=True).start()
+
+    def is_stale(entry):
+        return entry.expires_at is not None and time.time() > entry.expires_at
+
+    def should_recompute(entry):
+        if not early_expiration or entry.expires_at is None:
+            return False
+        gap = -entry.delta * early_expiration * math.log(1.0 - random.random())
+        return time.time() + gap >= entry.expires_at
+
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        cache = get_cache()
+        k = key_for(args, kwargs)
+        entry = cache.fetch(k)
+        if entry is not MISSING:
+            if is_stale(entry):
+                refresh_in_background(cache, k, args, kwargs)
+                return entry.value
+            if not should_recompute(entry):
+                return entry.value
+        if not single_flight:
+            return compute(cache, k, args, kwargs)
+        return compute_once(cache, k, entry, args, kwargs)
+
+    def invalidate(*args, **kwargs):
+        get_cache().delete(key_for(args, kwargs))
+
+    decorator.invalidate = invalidate
+    return decorator
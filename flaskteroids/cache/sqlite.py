@@ -0,0 +1,182 @@
+import os
+import time
+import pickle
+import sqlite3
+import threading
+import itertools
+from pathlib import Path
+from flaskteroids.cache.base import Cache, MISSING, matches
+
+_MAX_PARAMS = 500
+
+
+class SQLiteCache(Cache):
+    """
+    Cache stored in a SQLite database in WAL mode.
+    It can be shared by all the processes running in the same host
+    (e.g. gunicorn workers) by pointing them to the same file.
+    Every `sweep_every` writes, expired entries are deleted and, when bounded by
+    `max_entries`, the least recently written entries beyond the limit too.
+    """
+
+    def __init__(self, path='storage/cache.db', timeout=5.0, max_entries=None, sweep_every=1000):
+        self._path = str(path)
+        self._timeout = timeout
+        self._max_entries = max_entries
+        self._sweep_every = sweep_every
+        self._writes = itertools.count(1)
+        self._local = threading.local()
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)'
+            )
+
+    def _connection(self):
+        # Connections can not be shared between threads nor survive a fork,
+        # so there is one per thread and process
+        pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != pid:
+            conn = sqlite3.connect(self._path, timeout=self._timeout, isolation_level=None)
+            self._enable_wal(conn)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def _enable_wal(self, conn):
+        # Switching the journal mode ignores the busy timeout, so processes
+        # opening a fresh database at the same time have to retry by hand
+        deadline = time.monotonic() + self._timeout
+        while True:
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+                return
+            except sqlite3.OperationalError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.01)
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def store(self, key: str, value, ttl=None):
+        with self._transaction() as conn:
+            self._store(conn, key, value, ttl)
+
+    def fetch(self, key: str):
+        return self._fetch(self._connection(), key)
+
+    def fetch_multi(self, keys):
+        keys = list(keys)
+        conn = self._connection()
+        res = {}
+        now = time.time()
+        # Keeps the number of parameters below the limit of old SQLite versions
+        for i in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[i:i + _MAX_PARAMS]
+            rows = conn.execute(
+                f'SELECT key, value, expires_at FROM cache_entries WHERE key IN ({", ".join("?" * len(chunk))})',
+                chunk
+            )
+            res.update((k, pickle.loads(v)) for k, v, expires_at in rows if not expires_at or now <= expires_at)
+        return res
+
+    def store_multi(self, values, ttl=None):
+        with self._transaction() as conn:
+            for k, v in values.items():
+                self._store(conn, k, v, ttl)
+
+    def increment(self, key: str, ttl=None, amount=1):
+        with self._transaction() as conn:
+            val = self._fetch(conn, key)
+            val = (0 if val is MISSING else val) + amount
+            self._store(conn, key, val, ttl)
+        return val
+
+    def add(self, key: str, value, ttl=None):
+        with self._transaction() as conn:
+            if self._fetch(conn, key) is not MISSING:
+                return False
+            self._store(conn, key, value, ttl)
+        return True
+
+    def compare_and_set(self, key: str, expected, value, ttl=None):
+        with self._transaction() as conn:
+            if not matches(self._fetch(conn, key), expected):
+                return False
+            self._store(conn, key, value, ttl)
+        return True
+
+    def compare_and_delete(self, key: str, expected):
+        with self._transaction() as conn:
+            if not matches(self._fetch(conn, key), expected):
+                return False
+            conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        return True
+
+    def update_multi(self, keys, fn):
+        with self._transaction() as conn:
+            updates, result = fn({k: self._fetch(conn, k) for k in keys})
+            for k, (value, ttl) in updates.items():
+                self._store(conn, k, value, ttl)
+        return result
+
+    def delete(self, key: str):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def sweep(self):
+        with self._transaction() as conn:
+            return self._sweep(conn)
+
+    def _store(self, conn, key, value, ttl):
+        expires_at = time.time() + ttl if ttl else None
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value), expires_at)
+        )
+        if self._sweep_every and next(self._writes) % self._sweep_every == 0:
+            self._sweep(conn)
+
+    def _sweep(self, conn):
+        deleted = conn.execute('DELETE FROM cache_entries WHERE expires_at < ?', (time.time(),)).rowcount
+        if self._max_entries is not None:
+            # Replaced entries get a new rowid, so the lowest ones are the least recently written
+            (count,) = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()
+            if count > self._max_entries:
+                deleted += conn.execute(
+                    'DELETE FROM cache_entries WHERE rowid IN '
+                    '(SELECT rowid FROM cache_entries ORDER BY rowid LIMIT ?)',
+                    (count - self._max_entries,)
+                ).rowcount
+        return deleted
+
+    def _fetch(self, conn, key):
+        row = conn.execute(
+            'SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row:
+            value, expires_at = row
+            if not expires_at or time.time() <= expires_at:
+                return pickle.loads(value)
+        return MISSING
+
+
+class _Transaction:
+    """Write transaction taking the database lock upfront to serialize concurrent writers"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute('BEGIN IMMEDIATE')
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self._conn.execute('ROLLBACK')
+        else:
+            self._conn.execute('COMMIT')
@@ -1,4 +1,5 @@
 import click
+from flask import current_app
 from flask.cli import with_appcontext
 from alembic import command
 from flaskteroids.cli.db.config import get_config
@@ -30,3 +31,17 @@ def rollback():
     config = get_config()
     revision = '-1'
     command.downgrade(config, revision=revision)
+
+
+@click.command('db:reset_counters')
+@click.argument('models', nargs=-1)
+@with_appcontext
+def reset_counters(models):
+    """Recompute counter caches, for all models or the given ones"""
+    db = current_app.extensions['flaskteroids.db']
+    unknown = [m for m in models if m not in db.models]
+    if unknown:
+        raise click.BadParameter(f'Unknown models {unknown}', param_hint='models')
+    for name, model in db.models.items():
+        if not models or name in models:
+            model.reset_counters()
@@ -53,6 +53,7 @@ __pycache__/
 .venv/
 storage/database.db
 storage/jobs_database.db
+storage/cache.db*
     """
 
 
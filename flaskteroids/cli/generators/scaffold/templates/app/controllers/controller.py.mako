@@ -15,7 +15,7 @@ class ${controller}Controller(ApplicationController):
     def index(self):
         self.${models_ref} = ${model}.all()
         return respond(
-            html=lambda: render('index'),
+            html=lambda: self._render_index(),
             json=lambda: render(json=self.${models_ref})
         )
 
@@ -63,6 +63,11 @@ class ${controller}Controller(ApplicationController):
             json=lambda: head(HTTPStatus.NO_CONTENT)
         )
 
+    def _render_index(self):
+        # The list only shows some columns, JSON responses keep all of them
+        self.${models_ref}.select(${', '.join(repr(c) for c in ['id', *(f['name'] for f in fields)])})
+        return render('index')
+
     def _set_${model_ref}(self):
         self.${model_ref} = ${model}.find(id=params['id'])
 
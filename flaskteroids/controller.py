@@ -1,7 +1,8 @@
 from functools import wraps
-from flask import render_template, request, make_response, g, jsonify
+from flask import render_template, request, make_response, g, jsonify, current_app, stream_with_context, Response
 from flaskteroids.actions import decorate_action, get_actions, register_actions, params
 from flaskteroids.rules import bind_rules
+from flaskteroids.db import enable_query_cache
 from flaskteroids.inflector import inflector
 
 
@@ -23,6 +24,9 @@ def _decorate_action(cls, action):
 
     @wraps(action)
     def wrapper(self, *args, **kwargs):
+        g.action_name = action.__name__
+        if current_app.config['DB'].get('QUERY_CACHE', True):
+            enable_query_cache()
         res = action(self, *args, **kwargs)
         if res:
             return res
@@ -52,15 +56,36 @@ class FormatResponder:
             return "406 Not Acceptable", 406
 
 
-def render(action=None, *, status=200, json=None):
+def render(action=None, *, status=200, json=None, stream=False):
     if action:
         cname = inflector.underscore(g.controller.__class__.__name__.replace("Controller", ""))
         view = render_template(f'{cname}/{action}.html', **{**g.controller.__dict__, 'params': params})
         return make_response(view, status)
     elif json:
+        if stream and hasattr(json, 'stream_json'):
+            return _stream_json(json, status, ndjson=stream == 'ndjson')
         return jsonify(json.__json__())
 
 
+def _stream_json(query, status, ndjson, batch_size=1000):
+    def generate():
+        dumps = current_app.json.dumps
+        if ndjson:
+            for batch in query.stream_json(batch_size):
+                yield ''.join(f'{dumps(r)}\n' for r in batch)
+            return
+        yield '['
+        separator = ''
+        for batch in query.stream_json(batch_size):
+            if batch:
+                yield separator + ','.join(dumps(r) for r in batch)
+                separator = ','
+        yield ']'
+
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), status=status, mimetype=mimetype)
+
+
 def head(status=200, headers=None):
     res = make_response('', status)
     if headers:
@@ -76,3 +101,7 @@ def respond(**kwargs):
 class ActionController:
     def __init__(self, *args, **kwargs) -> None:
         g.controller = self
+
+    @property
+    def action_name(self):
+        return g.get('action_name')
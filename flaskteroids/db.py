@@ -1,5 +1,7 @@
+import time
 from werkzeug.local import LocalProxy
-from flask import g, current_app
+from flask import g, current_app, has_app_context
+import flaskteroids.cache as cache
 import logging
 
 
@@ -15,3 +17,96 @@ def _get_session():
 
 
 session = LocalProxy(_get_session)
+
+
+class QueryCache:
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def fetch(self, query, load):
+        key = _query_key(query)
+        if key is None:
+            return load()
+        if key in self._entries:
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        res = self._entries[key] = load()
+        return res
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _query_key(query):
+    # The same key SQLAlchemy uses to cache compiled statements (it also covers loader
+    # options, which do not show up in the SQL), plus the values of the parameters
+    cache_key = query._generate_cache_key()
+    if cache_key is None:
+        return None
+    return cache_key.key, repr([p.effective_value for p in cache_key.bindparams])
+
+
+def enable_query_cache():
+    if 'db_query_cache' not in g:
+        g.db_query_cache = QueryCache()
+
+
+def query_cache():
+    if not has_app_context():
+        return None
+    return g.get('db_query_cache')
+
+
+def clear_query_cache():
+    cache = query_cache()
+    if cache:
+        cache.clear()
+
+
+def delete_after_transaction(*keys):
+    """Deletes the keys once the transaction ends, so they are not filled again with uncommitted data"""
+    if not has_app_context():
+        for key in keys:
+            cache.delete(key)
+        return
+    g.setdefault('db_cache_deletions', set()).update(keys)
+
+
+def pending_cache_deletions():
+    if not has_app_context():
+        return ()
+    return g.get('db_cache_deletions', ())
+
+
+def table_version(table):
+    key = f'table-version:{table}'
+    version = cache.fetch(key)
+    if version is cache.MISSING:
+        # Starting from the current time, versions of a table whose entry was evicted are never reused
+        cache.add(key, time.time_ns())
+        version = cache.fetch(key)
+    return version
+
+
+def touch_tables(*tables):
+    """Versions change once the transaction of the current context ends"""
+    if not has_app_context():
+        bump_table_versions(tables)
+        return
+    g.setdefault('db_touched_tables', set()).update(tables)
+
+
+def touched_tables():
+    if not has_app_context():
+        return ()
+    return g.get('db_touched_tables', ())
+
+
+def bump_table_versions(tables):
+    for table in tables:
+        key = f'table-version:{table}'
+        if not cache.add(key, time.time_ns()):
+            cache.increment(key)
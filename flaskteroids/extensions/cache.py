@@ -0,0 +1,24 @@
+import logging
+from flaskteroids.cache.factory import create_cache
+
+_logger = logging.getLogger(__name__)
+
+
+class CacheExtension:
+
+    def __init__(self, app=None):
+        self._cache = None
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config.get('CACHE') or {}
+        self._cache = create_cache(config)
+        _logger.debug(f'using cache backend {self._cache.__class__.__name__}')
+        if not hasattr(app, 'extensions'):
+            app.extensions = {}
+        app.extensions['flaskteroids.cache'] = self
+
+    @property
+    def cache(self):
+        return self._cache
@@ -1,11 +1,20 @@
+import os
 import logging
+import traceback
+import sqlalchemy
+import jinja2
+import flask
+import werkzeug
+import flaskteroids
 from sqlalchemy.ext.automap import automap_base
 from sqlalchemy.exc import InvalidRequestError
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, event
 from sqlalchemy.orm import sessionmaker, scoped_session
-from flask import g
+from flask import g, has_request_context
 from flaskteroids.discovery import discover_classes
 import flaskteroids.registry as registry
+import flaskteroids.cache as cache
+from flaskteroids.db import bump_table_versions
 from flaskteroids.model import Model, init
 from flaskteroids.inflector import inflector
 
@@ -29,9 +38,14 @@ class SQLAlchemyExtension:
         app.extensions['flaskteroids.db'] = self
 
         self.init_models()
+        if app.config['DB'].get('DETECT_N_PLUS_ONE', app.debug):
+            _detect_n_plus_one(app, self._engine)
 
         @app.teardown_appcontext
         def _(exception=None):
+            query_cache = g.pop('db_query_cache', None)
+            if query_cache:
+                _logger.debug(f'query cache: {query_cache.hits} hits, {query_cache.misses} misses')
             db_session = g.pop('db_session', None)
             if db_session:
                 if exception:
@@ -42,6 +56,9 @@ class SQLAlchemyExtension:
                     db_session.commit()
                 _logger.debug('closing session')
                 db_session.close()
+            for key in g.pop('db_cache_deletions', ()):
+                cache.delete(key)
+            bump_table_versions(g.pop('db_touched_tables', ()))
 
     def create_session(self):
         return self._session_factory()
@@ -79,3 +96,37 @@ class SQLAlchemyExtension:
         # We don't want to automap relationships at this moment
         # Those will be done explicitly afterwards
         pass
+
+
+# Times the same statement has to run within a request to be reported
+_N_PLUS_ONE_THRESHOLD = 3
+_FRAMEWORK_PATHS = tuple(
+    os.path.dirname(m.__file__) + os.sep for m in (os, sqlalchemy, jinja2, flask, werkzeug, flaskteroids)
+)
+
+
+def _detect_n_plus_one(app, engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _(conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context():
+            return
+        statements = g.setdefault('db_statements', {})
+        if statement in statements:
+            statements[statement][0] += 1
+        else:
+            statements[statement] = [1, _call_site()]
+
+    @app.teardown_request
+    def _(exception=None):
+        statements = g.pop('db_statements', {})
+        for statement, (count, call_site) in statements.items():
+            if count >= _N_PLUS_ONE_THRESHOLD:
+                _logger.warning(f'N+1 query detected, ran {count} times from {call_site}: {statement}')
+
+
+def _call_site():
+    for frame, lineno in traceback.walk_stack(None):
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_FRAMEWORK_PATHS) and not filename.startswith('<'):
+            return f'{filename}:{lineno}'
+    return 'unknown'
@@ -1,5 +1,6 @@
 from markupsafe import Markup, escape
 from jinja2 import Template
+from flaskteroids.exceptions import ProgrammerError
 
 
 class Form:
@@ -98,18 +99,16 @@ class Form:
         return Markup(Template("""
             <select id="{{ id }}" name="{{ name }}">
               <option value="">{{ prompt }}</option>
-              {% for elem in collection %}
-              <option value="{{ elem[option_value] }}" {% if elem[option_value]|string == value %}selected{% endif %}>
-                {{ elem[option_display] }}
+              {% for option_value, option_display in options %}
+              <option value="{{ option_value }}" {% if option_value|string == value %}selected{% endif %}>
+                {{ option_display }}
               </option>
               {% endfor %}
             </select>
         """).render(
             id=self._get_id(field),
             name=self._get_name(field),
-            collection=collection,
-            option_value=option_value,
-            option_display=option_display,
+            options=_options(collection, option_value, option_display),
             prompt=prompt,
             value=value
         ))
@@ -117,3 +116,20 @@ class Form:
     def submit(self, value='Submit', **kwargs):
         attrs = self._build_attributes(kwargs)
         return Markup(f'<input type="submit" value="{value}" {attrs}>')
+
+
+def _options(collection, option_value, option_display):
+    if hasattr(collection, 'pluck'):
+        # Queries fetch just the two columns instead of building whole records
+        try:
+            return collection.pluck(option_value, option_display)
+        except ProgrammerError:
+            pass
+    return [(_get(e, option_value), _get(e, option_display)) for e in collection]
+
+
+def _get(elem, name):
+    try:
+        return elem[name]
+    except (TypeError, LookupError):
+        return getattr(elem, name)
@@ -1,9 +1,14 @@
+import os
+import hashlib
 import textwrap
+from functools import lru_cache
 from flask import render_template, url_for, current_app
 from markupsafe import Markup
 from flaskteroids.inflector import inflector
 from flaskteroids.form import Form
 from flaskteroids.csrf import CSRFToken
+from flaskteroids.cache.fragments import fragment_key
+import flaskteroids.cache as cache
 
 
 def link_to(name, path, **kwargs):
@@ -51,5 +56,44 @@ def render(template, **kwargs):
     return Markup(render_template(template, **kwargs))
 
 
+def render_collection(template, collection, as_=None, cached=False, **kwargs):
+    """Elements are available as as_, by default the name of the partial (post for posts/_post.html)"""
+    name = as_ or _partial_name(template)
+    # The template is looked up and the context built once for all the elements
+    tmpl = current_app.jinja_env.get_or_select_template(template)
+    context = dict(kwargs)
+    current_app.update_template_context(context)
+    elements = list(collection)
+    if not cached:
+        return Markup(''.join(tmpl.render({**context, name: e}) for e in elements))
+    prefix = f'views/{tmpl.name}/{_template_digest(tmpl)}'
+    keys = [f'{prefix}/{fragment_key(e)}' for e in elements]
+    hits = cache.fetch_multi(keys)
+    misses = {}
+    for key, e in zip(keys, elements):
+        if key not in hits and key not in misses:
+            misses[key] = tmpl.render({**context, name: e})
+    if misses:
+        cache.store_multi(misses)
+    return Markup(''.join(hits[key] if key in hits else misses[key] for key in keys))
+
+
+def _partial_name(template):
+    return os.path.basename(template).split('.')[0].lstrip('_')
+
+
+def _template_digest(template):
+    # Editing the template renders the elements again
+    if not template.filename or not os.path.exists(template.filename):
+        return template.name
+    return _file_digest(template.filename, os.path.getmtime(template.filename))
+
+
+@lru_cache(maxsize=256)
+def _file_digest(filename, mtime):
+    with open(filename, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
 def csrf_token():
     return CSRFToken(current_app.config.get('SECRET_KEY')).generate()
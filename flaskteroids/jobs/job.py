@@ -7,7 +7,7 @@ class Job:
         pass
 
     def perform_later(self, *args, **kwargs):
-        ns = registry.get(self.__class__)
+        ns = registry.compiled(self.__class__)
         task = ns.get('task')
         assert task, 'Task not registered'
         task.delay(*args, **kwargs)
@@ -1,12 +1,22 @@
 import logging
+import hashlib
 from typing import TypedDict, Any, NotRequired
 from datetime import datetime, timezone
 from functools import partial
+from types import MappingProxyType
 from itsdangerous import URLSafeTimedSerializer
 from werkzeug.security import check_password_hash, generate_password_hash
-from sqlalchemy import select, inspect
-from sqlalchemy.orm import relationship, selectinload
-from flaskteroids.db import session
+from sqlalchemy import select, insert, update, delete, inspect, func, Table
+from sqlalchemy.sql import visitors
+from sqlalchemy.dialects import sqlite, postgresql, mysql
+from sqlalchemy.orm import relationship, selectinload, joinedload, load_only, RelationshipProperty
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm import make_transient_to_detached
+from flaskteroids.db import (
+    session, query_cache, clear_query_cache, delete_after_transaction,
+    touch_tables, touched_tables, table_version
+)
+import flaskteroids.cache as cache
 from flaskteroids import fields
 from flask import current_app
 from flaskteroids.exceptions import ProgrammerError
@@ -19,6 +29,7 @@ _logger = logging.getLogger(__name__)
 
 def init(cls):
     bind_rules(cls)
+    _install_column_attributes(cls)
     return cls
 
 
@@ -26,6 +37,10 @@ class RecordNotFoundException(Exception):
     pass
 
 
+class StrictLoadingViolationError(ProgrammerError):
+    pass
+
+
 class Error:
     def __init__(self, args) -> None:
         self._args = args
@@ -83,9 +98,11 @@ def _link_associations(name, rel, cls, related_cls, fk_name):
 
 
 class PasswordAuthenticator:
+    __slots__ = ()
+
     @classmethod
     def authenticate_by(cls, **kwargs):
-        ns = registry.get(cls)
+        ns = registry.compiled(cls)
         pwname = ns.get('password_field')
         if not pwname:
             return
@@ -105,7 +122,7 @@ class PasswordAuthenticator:
         return cls.find(id_)
 
     def authenticate(self, password):
-        ns = registry.get(self.__class__)
+        ns = registry.compiled(self.__class__)
         pwname = ns.get('password_field')
         if not pwname:
             return False
@@ -131,7 +148,7 @@ def has_secure_password(pwname='password'):
         def _set_password_reset_token(self):
             serializer = URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
             token = serializer.dumps(self.id, salt='pwres')
-            self._virtual_fields[f'{pwname}_reset_token'] = token
+            self._writable('_virtual_fields')[f'{pwname}_reset_token'] = token
 
         virtual_fields[f'{pwname}_reset_token'] = {
             'read_only': True,
@@ -143,7 +160,13 @@ def has_secure_password(pwname='password'):
     return bind
 
 
-def belongs_to(name: str, class_name: str | None = None, foreign_key: str | None = None):
+def belongs_to(
+    name: str,
+    class_name: str | None = None,
+    foreign_key: str | None = None,
+    counter_cache: bool | str = False,
+    touch: bool = False
+):
     def bind(cls):
         ns = registry.get(Model)
         models = ns['models']
@@ -164,6 +187,7 @@ def belongs_to(name: str, class_name: str | None = None, foreign_key: str | None
         _link_associations(name, rel, cls, related_cls, fk_name)
 
         def rel_wrapper(self):
+            _check_lazy_load(self, name)
             related_base_instance = getattr(self._base_instance, name)
             if not related_base_instance:
                 return None
@@ -174,22 +198,155 @@ def belongs_to(name: str, class_name: str | None = None, foreign_key: str | None
         registry.get(cls).setdefault('validates', []).append(
             partial(_validate_fk, field=fk_name)
         )
+        if counter_cache:
+            column = counter_cache if isinstance(counter_cache, str) else f'{inflector.tableize(cls.__name__)}_count'
+            if column not in related_base.__table__.columns:
+                raise ProgrammerError(f'Counter cache column {column} not found for model {related_cls.__name__}')
+            registry.get(cls).setdefault('counter_caches', {})[fk_name] = {'class': related_cls, 'column': column}
+        if touch:
+            registry.get(cls).setdefault('touches', {})[fk_name] = {'class': related_cls}
+    return bind
+
+
+def strict_loading(mode: bool | str = 'raise'):
+    def bind(cls):
+        registry.get(cls)['strict_loading'] = mode
+    return bind
+
+
+def _check_lazy_load(instance, name):
+    state = inspect(instance._base_instance)
+    if not state.persistent or name not in state.unloaded:
+        return
+    # The query that loaded the record takes precedence over the model and the app settings
+    mode = state.info.get('strict_loading')
+    if mode is None:
+        mode = registry.compiled(instance.__class__).get('strict_loading')
+    if mode is None:
+        mode = current_app.config.get('DB', {}).get('STRICT_LOADING', False)
+    if not mode:
+        return
+    message = f'{instance.__class__.__name__}#{name} was lazily loaded, use includes to load it upfront'
+    if mode == 'log':
+        _logger.warning(message)
+        return
+    raise StrictLoadingViolationError(message)
+
+
+def cache_records(ttl: int | None = None):
+    """Entries are keyed by the table version, so any write to the table makes them stale when its transaction ends"""
+    def bind(cls):
+        registry.get(cls)['cache_records'] = {'ttl': ttl}
     return bind
 
 
+def _record_key(cls, id):
+    return f'records:{cls.__name__}:{table_version(_base(cls).__table__.name)}:{id}'
+
+
+def _from_cached(base, values):
+    # Rebuilds the row as if it was loaded, without querying the database
+    instance = base.__mapper__.class_manager.new_instance()
+    for name, value in values.items():
+        if name in base.__table__.columns:
+            set_committed_value(instance, name, value)
+    make_transient_to_detached(instance)
+    return session.merge(instance, load=False)
+
+
+def _loaded_values(base_instance, columns):
+    # Unloaded (e.g. deferred by select) columns are left out instead of loading them one by one
+    unloaded = inspect(base_instance).unloaded
+    return {c: getattr(base_instance, c) for c in columns if c not in unloaded}
+
+
+def _uncache_records(cls, ids):
+    if registry.compiled(cls).get('cache_records'):
+        delete_after_transaction(*(_record_key(cls, id) for id in ids))
+
+
+def _counter_keys(instance):
+    counters = registry.compiled(instance.__class__).get('counter_caches') or {}
+    return {fk_name: getattr(instance._base_instance, fk_name) for fk_name in counters}
+
+
+def _touch_keys(instance):
+    touches = registry.compiled(instance.__class__).get('touches') or {}
+    return {fk_name: getattr(instance._base_instance, fk_name) for fk_name in touches}
+
+
+def _touch_parents(instance, before, after):
+    touches = registry.compiled(instance.__class__).get('touches') or {}
+    for fk_name, touch in touches.items():
+        for id in {before.get(fk_name), after.get(fk_name)} - {None}:
+            parent = session.get(_base(touch['class']), id)
+            if parent is not None:
+                _build(touch['class'], parent).touch()
+
+
+def _update_counters(instance, before, after):
+    counters = registry.compiled(instance.__class__).get('counter_caches') or {}
+    for fk_name, counter in counters.items():
+        previous, current = before.get(fk_name), after.get(fk_name)
+        if previous == current:
+            continue
+        for id, amount in ((previous, -1), (current, 1)):
+            if id is not None:
+                _increment_counter(counter['class'], counter['column'], id, amount)
+
+
+def _increment_counter(cls, column, id, amount):
+    base = _base(cls)
+    field = getattr(base, column)
+    stmt = update(base).where(base.id == id).values({column: func.coalesce(field, 0) + amount})
+    # Refreshes the counter of the parent record if it's loaded in the session
+    session.execute(stmt.execution_options(synchronize_session='fetch'))
+    _uncache_records(cls, [id])
+    _changed(base)
+
+
 class Relation:
-    def __init__(self, instance, related_cls, name) -> None:
+    def __init__(self, instance, related_cls, name, fk_name) -> None:
         self._instance = instance
         self._related_cls = related_cls
         self._name = name
+        self._fk_name = fk_name
 
     def _entries(self):
         return getattr(self._instance._base_instance, self._name)
 
+    def _loaded(self):
+        state = inspect(self._instance._base_instance)
+        return not state.persistent or self._name not in state.unloaded
+
+    def _query(self):
+        return self._related_cls.where(**{self._fk_name: self._instance.id})
+
+    def _counter(self):
+        counters = registry.compiled(self._related_cls).get('counter_caches') or {}
+        counter = counters.get(self._fk_name)
+        if counter and self._instance.is_persisted():
+            return getattr(self._instance, counter['column'])
+
     def __len__(self):
-        return len(self._entries())
+        # Counting in the database avoids loading the whole association
+        if self._loaded():
+            return len(self._entries())
+        counter = self._counter()
+        if counter is not None:
+            return counter
+        return self._query().count()
+
+    def __bool__(self):
+        if self._loaded():
+            return bool(self._entries())
+        counter = self._counter()
+        if counter is not None:
+            return counter > 0
+        return self._query().exists()
 
     def __iter__(self):
+        _check_lazy_load(self._instance, self._name)
         for v in self._entries():
             yield _build(self._related_cls, v)
 
@@ -198,8 +355,10 @@ class Relation:
 
     def create(self, **kwargs):
         related_instance = self._related_cls.new(**kwargs)
+        before = _counter_keys(related_instance)
         self._entries().append(related_instance._base_instance)
         self._instance.save()
+        _update_counters(related_instance, before, _counter_keys(related_instance))
         return related_instance
 
 
@@ -229,7 +388,7 @@ def has_many(name: str, class_name: str | None = None, foreign_key: str | None =
         _link_associations(name, rel, cls, related_cls, fk_name)
 
         def rel_wrapper(self):
-            return Relation(self, related_cls, name)
+            return Relation(self, related_cls, name, fk_name)
 
         setattr(cls, name, property(rel_wrapper))
     return bind
@@ -383,7 +542,7 @@ def _validate_fk(*, instance, field, config=True):
 
 
 def _get_association(model_cls, *, name):
-    ns = registry.get(model_cls)
+    ns = registry.compiled(model_cls)
     associations = ns.get('associations') or {}
     for cn, fk in associations.keys():
         if fk == name or associations[(cn, fk)]['name'] == name:
@@ -391,13 +550,21 @@ def _get_association(model_cls, *, name):
 
 
 def _build(model_cls, base_instance):
-    res = model_cls()
-    res._base_instance = base_instance
+    # Loaded rows skip __init__, which would create a throwaway base instance
+    res = object.__new__(model_cls)
+    _init_state(res, base_instance)
     return res
 
 
+def _init_state(instance, base_instance):
+    object.__setattr__(instance, '_base_instance', base_instance)
+    object.__setattr__(instance, '_changes', _EMPTY)
+    object.__setattr__(instance, '_virtual_fields', _EMPTY)
+    object.__setattr__(instance, '_errors', None)
+
+
 def _base(model_cls):
-    base = registry.get(model_cls).get('base_class')
+    base = registry.compiled(model_cls).get('base_class')
     if not base:
         raise ProgrammerError(
             f'Base class not found for model {model_cls.__name__}.\n'
@@ -407,11 +574,60 @@ def _base(model_cls):
     return base
 
 
+class _ColumnAttribute:
+    __slots__ = ('_name', '_field')
+
+    def __init__(self, name, field):
+        self._name = name
+        self._field = field
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return getattr(_base(owner), self._name)
+        changes = instance._changes
+        if self._name in changes:
+            return changes[self._name]
+        return getattr(instance._base_instance, self._name)
+
+    def __set__(self, instance, value):
+        instance._writable('_changes')[self._name] = self._field.as_primitive(value)
+
+
+def _install_column_attributes(cls):
+    try:
+        base = _base(cls)
+    except ProgrammerError:
+        return
+    virtual_fields = registry.compiled(cls).get('virtual_fields', {})
+    columns = []
+    for name, column in base.__table__.columns.items():
+        if name in virtual_fields or _is_defined(cls, name):
+            continue
+        try:
+            field = fields.from_column_type(column.type)
+        except ValueError:
+            continue  # Unsupported types go through the generic path
+        setattr(cls, name, _ColumnAttribute(name, field))
+        columns.append(name)
+    cls._direct_fields = frozenset(Model._fields) | frozenset(columns)
+
+
+def _is_defined(cls, name):
+    for c in cls.__mro__:
+        if name in c.__dict__:
+            return not isinstance(c.__dict__[name], _ColumnAttribute)
+    return False
+
+
 class ModelQuery:
     def __init__(self, model_cls):
         self._model_cls = model_cls
         self._model_base = _base(model_cls)
         self._query = select(self._model_base)
+        self._strict_loading = None
+        self._preloads = ()
+        self._loads = ()
+        self._cache = None
 
     def find(self, id):
         found = self.where(id=id).first()
@@ -426,19 +642,155 @@ class ModelQuery:
             self._query = self._query.filter_by(**kwargs)
         return self
 
-    def includes(self, *args):
-        for rel in args:
-            self._query = self._query.options(selectinload(getattr(self._model_base, rel)))
+    def includes(self, *args, **kwargs):
+        spec = _includes_spec(args, kwargs)
+        self._query = self._query.options(*_loader_options(self._model_cls, spec, joined=False))
+        self._loads = self._loads + (('includes', spec),)
+        return self
+
+    def eager_load(self, *args, **kwargs):
+        """has_many associations are still loaded with a separate query, joining them would repeat the parent columns"""
+        spec = _includes_spec(args, kwargs)
+        self._query = self._query.options(*_loader_options(self._model_cls, spec, joined=True))
+        self._loads = self._loads + (('eager_load', spec),)
         return self
 
+    def preload(self, *args, chunk_size=1000, **kwargs):
+        """Associations are fetched after loading the records, with IN lists of at most chunk_size keys"""
+        self._preloads = self._preloads + ((_includes_spec(args, kwargs), chunk_size),)
+        return self
+
+    def _with_preloads(self, rows):
+        for spec, chunk_size in self._preloads:
+            _preload(self._model_cls, rows, spec, chunk_size)
+        return rows
+
+    def strict_loading(self, mode: bool | str = 'raise'):
+        self._strict_loading = mode
+        return self
+
+    def _record(self, base_instance):
+        if self._strict_loading is not None:
+            inspect(base_instance).info['strict_loading'] = self._strict_loading
+        return _build(self._model_cls, base_instance)
+
+    def cache(self, ttl=None, key=None):
+        """Results are used until a table read by the query is written, see touch_tables"""
+        self._cache = {'ttl': ttl, 'key': key or self._model_cls.__name__}
+        return self
+
+    def _rows(self, query):
+        if self._cache is None:
+            return _rows(query)
+        tables = {t.name for t in visitors.iterate(query) if isinstance(t, Table)}
+        if tables & set(touched_tables()):
+            # Written within this transaction, the cache should not see it until it ends
+            return _rows(query)
+        compiled = query.compile(dialect=session.get_bind().dialect)
+        # Associations loaded with separate queries do not show up in the SQL
+        digest = hashlib.sha1(f'{compiled}:{compiled.params!r}:{self._loads!r}'.encode()).hexdigest()
+        key = f'queries:{self._cache["key"]}:{digest}'
+        versions = {t: table_version(t) for t in sorted(tables)}
+        cached = cache.fetch(key)
+        if cached is not cache.MISSING and cached[0] == versions:
+            return self._from_cached_rows(query, cached[1])
+        rows = _rows(query)
+        cache.store(key, (versions, self._to_cached_rows(rows)), self._cache['ttl'])
+        return rows
+
+    def _to_cached_rows(self, rows):
+        base = self._model_base
+        if rows and isinstance(rows[0][0], base):
+            if self._loads:
+                # Associations can not be stored, the records are loaded again by id along with them
+                return 'ids', [r[0].id for r in rows]
+            # Records are stored as their loaded column values, so they can be merged back into any session
+            columns = base.__table__.columns.keys()
+            return 'records', [_loaded_values(r[0], columns) for r in rows]
+        return 'values', [tuple(r) for r in rows]
+
+    def _from_cached_rows(self, query, cached):
+        kind, rows = cached
+        if kind == 'ids':
+            # The order of the query is kept, its limit and offset are already applied by the ids
+            return _rows(query.limit(None).offset(None).where(self._model_base.id.in_(rows)))
+        if kind == 'records':
+            return [(_from_cached(self._model_base, values),) for values in rows]
+        return rows
+
+    def limit(self, limit):
+        self._query = self._query.limit(limit)
+        return self
+
+    def offset(self, offset):
+        self._query = self._query.offset(offset)
+        return self
+
+    def count(self):
+        return self._aggregate(func.count, 'id')
+
+    def exists(self):
+        return self._rows(select(self._query.exists()))[0][0]
+
+    def sum(self, column):
+        return self._aggregate(func.sum, column)
+
+    def avg(self, column):
+        return self._aggregate(func.avg, column)
+
+    def min(self, column):
+        return self._aggregate(func.min, column)
+
+    def max(self, column):
+        return self._aggregate(func.max, column)
+
+    def _aggregate(self, fn, column):
+        # Aggregating over a subquery keeps limit and offset in effect
+        subquery = self._project([column]).subquery()
+        return self._rows(select(fn(subquery.c[column])))[0][0]
+
+    def select(self, *columns):
+        """Other columns are left out of the JSON of the records and loaded on first access"""
+        self._query = self._query.options(load_only(*self._columns(columns)))
+        return self
+
+    def pluck(self, *columns):
+        rows = self._rows(self._project(columns))
+        if len(columns) == 1:
+            return [r[0] for r in rows]
+        return [tuple(r) for r in rows]
+
+    def pick(self, *columns):
+        rows = self._rows(self._project(columns).limit(1))
+        if not rows:
+            return None
+        return rows[0][0] if len(columns) == 1 else tuple(rows[0])
+
+    def ids(self):
+        return self.pluck('id')
+
+    def _columns(self, names):
+        table = self._model_base.__table__
+        unknown = [n for n in names if n not in table.columns]
+        if unknown:
+            raise ProgrammerError(f'Unknown columns {unknown} for model {self._model_cls.__name__}')
+        return [getattr(self._model_base, n) for n in names]
+
+    def _project(self, names):
+        if not names:
+            raise ProgrammerError('At least one column is required')
+        return self._query.with_only_columns(*self._columns(names), maintain_column_froms=True)
+
     def all(self):
         yield from self.__iter__()
 
     def first(self):
-        res = session.execute(self._query).scalars().first()
-        if not res:
+        rows = self._rows(self._query.limit(1))
+        if not rows:
             return None
-        return _build(self._model_cls, res)
+        res = rows[0][0]
+        self._with_preloads([res])
+        return self._record(res)
 
     def order(self, **kwargs):
         for k, v in kwargs.items():
@@ -448,9 +800,10 @@ class ModelQuery:
         return self
 
     def __iter__(self):
-        res = session.execute(self._query).scalars()
+        res = [r[0] for r in self._rows(self._query)]
+        self._with_preloads(res)
         for r in res:
-            yield _build(self._model_cls, r)
+            yield self._record(r)
 
     def __repr__(self):
         return repr([r for r in self])
@@ -459,11 +812,219 @@ class ModelQuery:
         return str(self._query.compile(compile_kwargs={"literal_binds": True}))
 
     def __json__(self):
-        res = session.execute(self._query).scalars()
-        return [_build(self._model_cls, r).__json__() for r in res]
+        return [_build(self._model_cls, r[0]).__json__() for r in self._rows(self._query)]
+
+    def find_each(self, batch_size=1000):
+        for batch in self.find_in_batches(batch_size=batch_size):
+            yield from batch
+
+    def find_in_batches(self, batch_size=1000):
+        """Keyset paginated (id > last id) so every batch costs the same, rows are expunged after their batch"""
+        pk = self._model_base.id
+        query = self._query.order_by(None).order_by(pk.asc()).limit(batch_size)
+        last = None
+        while True:
+            loaded = set(session.identity_map.keys())
+            batch_query = query if last is None else query.where(pk > last)
+            rows = session.execute(batch_query).scalars().all()
+            if not rows:
+                return
+            last = rows[-1].id
+            self._with_preloads(rows)
+            yield [self._record(r) for r in rows]
+            _expunge(rows, loaded)
+            if len(rows) < batch_size:
+                return
+
+    def stream(self, batch_size=1000):
+        for batch in self._stream_batches(batch_size):
+            yield from batch
+
+    def stream_json(self, batch_size=1000):
+        for batch in self._stream_batches(batch_size):
+            yield [r.__json__() for r in batch]
+
+    def _stream_batches(self, batch_size):
+        query = self._query.execution_options(yield_per=batch_size)
+        partitions = session.execute(query).scalars().partitions()
+        while True:
+            loaded = set(session.identity_map.keys())
+            rows = next(partitions, None)
+            if rows is None:
+                return
+            self._with_preloads(rows)
+            yield [self._record(r) for r in rows]
+            _expunge(rows, loaded)
+
+    def in_batches(self, batch_size=1000):
+        pk = self._model_base.id
+        query = select(pk).order_by(pk.asc()).limit(batch_size)
+        if self._query.whereclause is not None:
+            query = query.where(self._query.whereclause)
+        last = None
+        while True:
+            batch_query = query if last is None else query.where(pk > last)
+            ids = session.execute(batch_query).scalars().all()
+            if not ids:
+                return
+            last = ids[-1]
+            yield self._derive(self._query.order_by(None).where(pk.in_(ids)))
+            if len(ids) < batch_size:
+                return
+
+    def _derive(self, query):
+        res = ModelQuery(self._model_cls)
+        res._query = query
+        res._strict_loading = self._strict_loading
+        res._preloads = self._preloads
+        res._loads = self._loads
+        res._cache = self._cache
+        return res
+
+    def _cached_ids(self):
+        if not registry.compiled(self._model_cls).get('cache_records'):
+            return []
+        return self.ids()
+
+    def update_all(self, **values):
+        values = {**values, **_timestamps(self._model_base, 'updated_at')}
+        stmt = update(self._model_base).values(**values)
+        if self._query.whereclause is not None:
+            stmt = stmt.where(self._query.whereclause)
+        _uncache_records(self._model_cls, self._cached_ids())
+        _changed(self._model_base)
+        return session.execute(stmt).rowcount
+
+    def delete_all(self):
+        stmt = delete(self._model_base)
+        if self._query.whereclause is not None:
+            stmt = stmt.where(self._query.whereclause)
+        _uncache_records(self._model_cls, self._cached_ids())
+        _changed(self._model_base)
+        return session.execute(stmt).rowcount
+
+
+def _changed(base, cascade=False):
+    tables = [base.__table__.name]
+    if cascade:
+        tables.extend(r.mapper.local_table.name for r in base.__mapper__.relationships if r.cascade.delete)
+    clear_query_cache()
+    touch_tables(*tables)
+
+
+def _pending_tables():
+    # Records are dirty when only their collections changed, which does not write them
+    dirty = [o for o in session.dirty if session.is_modified(o, include_collections=False)]
+    return {inspect(o).mapper.local_table.name for o in (*session.new, *dirty, *session.deleted)}
+
+
+def _rows(query):
+    cache = query_cache()
+    if cache is None:
+        return session.execute(query).all()
+    return cache.fetch(query, lambda: session.execute(query).all())
+
+
+def _includes_spec(args, kwargs):
+    spec = {}
+    for arg in (*args, kwargs):
+        if isinstance(arg, str):
+            spec[arg] = {}
+        elif isinstance(arg, dict):
+            for name, nested in arg.items():
+                spec[name] = _includes_spec(nested if isinstance(nested, (list, tuple)) else (nested,), {})
+        else:
+            raise ProgrammerError(f'Invalid association {arg!r}, expected a name or a dict of nested associations')
+    return spec
+
+
+def _association(model_cls, name):
+    rel = getattr(_base(model_cls), name, None)
+    if rel is None or not isinstance(getattr(rel, 'property', None), RelationshipProperty):
+        raise ProgrammerError(f'{name} is not an association of {model_cls.__name__}')
+    related = registry.compiled(model_cls).get('associations') or {}
+    related_cls = next((a['class'] for a in related.values() if a['name'] == name), None)
+    return rel, related_cls
+
+
+def _loader_options(model_cls, spec, joined):
+    options = []
+    for name, nested in spec.items():
+        rel, related_cls = _association(model_cls, name)
+        to_one = not rel.property.uselist
+        option = joinedload(rel) if joined and to_one else selectinload(rel)
+        if nested:
+            option = option.options(*_loader_options(related_cls, nested, joined))
+        options.append(option)
+    return options
+
+
+def _preload(model_cls, rows, spec, chunk_size):
+    for name, nested in spec.items():
+        rel, related_cls = _association(model_cls, name)
+        prop = rel.property
+        [(local, remote)] = prop.local_remote_pairs
+        local_key = prop.parent.get_property_by_column(local).key
+        remote_attr = getattr(prop.mapper.class_, prop.mapper.get_property_by_column(remote).key)
+        keys = list({k for k in (getattr(r, local_key) for r in rows) if k is not None})
+        by_key = {}
+        for i in range(0, len(keys), chunk_size):
+            query = select(prop.mapper.class_).where(remote_attr.in_(keys[i:i + chunk_size]))
+            for related in session.execute(query).scalars():
+                by_key.setdefault(getattr(related, remote_attr.key), []).append(related)
+        for r in rows:
+            related = by_key.get(getattr(r, local_key), [])
+            set_committed_value(r, name, related if prop.uselist else next(iter(related), None))
+        if nested:
+            _preload(related_cls, [v for values in by_key.values() for v in values], nested, chunk_size)
+
+
+def _expunge(rows, loaded):
+    # Rows already loaded before iterating are kept, the caller may still use them
+    for r in rows:
+        if inspect(r).identity_key not in loaded:
+            session.expunge(r)
+
+
+def _timestamps(base, *names):
+    now = datetime.now(timezone.utc)
+    columns = base.__table__.columns
+    return {name: now for name in names if name in columns}
+
+
+def _upsert_statement(base, rows, unique_by):
+    dialect = session.get_bind().dialect.name
+    match dialect:
+        case 'sqlite':
+            stmt = sqlite.insert(base).values(rows)
+        case 'postgresql':
+            stmt = postgresql.insert(base).values(rows)
+        case 'mysql' | 'mariadb':
+            stmt = mysql.insert(base).values(rows)
+        case _:
+            raise ProgrammerError(f'upsert_all is not supported for {dialect} databases')
+    updated = {
+        c: getattr(stmt.inserted if dialect in ('mysql', 'mariadb') else stmt.excluded, c)
+        for c in rows[0].keys() if c not in unique_by and c != 'created_at'
+    }
+    if dialect in ('mysql', 'mariadb'):
+        return stmt.on_duplicate_key_update(**updated)
+    if not updated:
+        return stmt.on_conflict_do_nothing(index_elements=unique_by)
+    return stmt.on_conflict_do_update(index_elements=unique_by, set_=updated)
+
+
+# Shared by instances until they need their own mutable state
+_EMPTY = MappingProxyType({})
 
 
 class ModelMeta(type):
+
+    def __new__(mcls, name, bases, namespace, **kwargs):
+        # Models only keep state in the slots defined by Model
+        namespace.setdefault('__slots__', ())
+        return super().__new__(mcls, name, bases, namespace, **kwargs)
+
     def __getattr__(cls, name):
         base = _base(cls)
         return getattr(base, name)
@@ -471,19 +1032,22 @@ class ModelMeta(type):
 
 class Model(metaclass=ModelMeta):
 
+    __slots__ = ('_changes', '_virtual_fields', '_base_instance', '_errors')
+
     _fields = ['_changes', '_virtual_fields', '_base_instance', '_errors']
+    # Attributes set without going through the generic path, columns are added on init
+    _direct_fields = frozenset(_fields)
 
     def __init__(self, **kwargs):
         base = _base(self.__class__)
-        self._virtual_fields = {}
-        self._changes = {}
-        self._base_instance = base()
-        self._errors = Errors()
+        _init_state(self, base())
         for k, v in kwargs.items():
             setattr(self, k, v)
 
     @property
     def errors(self):
+        if self._errors is None:
+            self._errors = Errors()
         return self._errors
 
     @property
@@ -491,8 +1055,8 @@ class Model(metaclass=ModelMeta):
         return list(self._base_instance.__table__.columns.keys())
 
     def __getattr__(self, name):
-        ns = registry.get(self.__class__)
-        vfd = ns.setdefault('virtual_fields', {})
+        ns = registry.compiled(self.__class__)
+        vfd = ns.get('virtual_fields', {})
         if name not in self._virtual_fields and name in vfd:
             if vfd[name].get('read_only', False):
                 set_fn = vfd[name].get('set_fn')
@@ -505,39 +1069,49 @@ class Model(metaclass=ModelMeta):
         return getattr(self._base_instance, name)
 
     def __setattr__(self, name, value):
-        if name in self._fields:
+        if name in self._direct_fields:
             super().__setattr__(name, value)
             return
-        ns = registry.get(self.__class__)
-        vfd = ns.setdefault('virtual_fields', {})
+        ns = registry.compiled(self.__class__)
+        vfd = ns.get('virtual_fields', {})
         if name in vfd:
             if vfd[name].get('read_only', False):
                 raise AttributeError('You are trying to update a read-only attribute')
-            self._virtual_fields[name] = value
+            self._writable('_virtual_fields')[name] = value
             set_fn = vfd[name].get('set_fn')
             if set_fn:
                 set_fn(self)
         elif name in self._base_instance.__table__.columns:
             column = self._base_instance.__table__.columns[name]
-            self._changes[name] = fields.from_column_type(column.type).as_primitive(value)
+            self._writable('_changes')[name] = fields.from_column_type(column.type).as_primitive(value)
         else:
             association = _get_association(self.__class__, name=name)
             if association:
-                self._changes[name] = value
+                changes = self._writable('_changes')
+                changes[name] = value
                 if association['fk_name'] != name:
-                    self._changes[association['fk_name']] = value.id
+                    changes[association['fk_name']] = value.id
 
     def __json__(self):
-        ns = registry.get(self.__class__)
-        vfd = ns.setdefault('virtual_fields', {})
+        ns = registry.compiled(self.__class__)
+        vfd = ns.get('virtual_fields', {})
         for name in vfd:
             if name not in self._virtual_fields and name in vfd:
                 if vfd[name].get('read_only', False):
                     set_fn = vfd[name].get('set_fn')
                     if set_fn:
                         set_fn(self)
-        stored_values = {c: getattr(self._base_instance, c) for c in self.column_names}
-        return self._virtual_fields | stored_values | self._changes
+        # Columns left out by a projection (see ModelQuery.select) are not loaded
+        unloaded = inspect(self._base_instance).unloaded if self.is_persisted() else ()
+        stored_values = {c: getattr(self._base_instance, c) for c in self.column_names if c not in unloaded}
+        return {**self._virtual_fields, **stored_values, **self._changes}
+
+    def _writable(self, name):
+        value = getattr(self, name)
+        if value is _EMPTY:
+            value = {}
+            object.__setattr__(self, name, value)
+        return value
 
     @classmethod
     def new(cls, **kwargs):
@@ -555,21 +1129,98 @@ class Model(metaclass=ModelMeta):
         return ModelQuery(cls)
 
     @classmethod
-    def includes(cls, *args):
-        return ModelQuery(cls).includes(*args)
+    def includes(cls, *args, **kwargs):
+        return ModelQuery(cls).includes(*args, **kwargs)
+
+    @classmethod
+    def eager_load(cls, *args, **kwargs):
+        return ModelQuery(cls).eager_load(*args, **kwargs)
+
+    @classmethod
+    def preload(cls, *args, chunk_size=1000, **kwargs):
+        return ModelQuery(cls).preload(*args, chunk_size=chunk_size, **kwargs)
+
+    @classmethod
+    def strict_loading(cls, mode: bool | str = 'raise'):
+        return ModelQuery(cls).strict_loading(mode)
 
     @classmethod
     def find(cls, id):
+        if registry.compiled(cls).get('cache_records'):
+            return cls.cached_find(id)
         return ModelQuery(cls).find(id)
 
+    @classmethod
+    def cached_find(cls, id):
+        config = registry.compiled(cls).get('cache_records')
+        if not config:
+            raise ProgrammerError(f'Records of {cls.__name__} are not cached, add the cache_records rule to it')
+        if _base(cls).__table__.name in touched_tables():
+            # Changed within this transaction, the cache should not see it until it ends
+            return ModelQuery(cls).find(id)
+        # The version is read before the record, so values read before another
+        # transaction commits are stored under a version that is already stale
+        key = _record_key(cls, id)
+        values = cache.fetch(key)
+        if values is cache.MISSING:
+            record = ModelQuery(cls).find(id)
+            base_instance = record._base_instance
+            cache.store(key, {c: getattr(base_instance, c) for c in record.column_names}, config['ttl'])
+            return record
+        return _build(cls, _from_cached(_base(cls), values))
+
     @classmethod
     def find_by(cls, **kwargs):
+        if list(kwargs) == ['id'] and registry.compiled(cls).get('cache_records'):
+            try:
+                return cls.cached_find(kwargs['id'])
+            except RecordNotFoundException:
+                return None
         return ModelQuery(cls).where(**kwargs).first()
 
     @classmethod
     def where(cls, *args, **kwargs):
         return ModelQuery(cls).where(*args, **kwargs)
 
+    @classmethod
+    def select(cls, *columns):
+        return ModelQuery(cls).select(*columns)
+
+    @classmethod
+    def pluck(cls, *columns):
+        return ModelQuery(cls).pluck(*columns)
+
+    @classmethod
+    def pick(cls, *columns):
+        return ModelQuery(cls).pick(*columns)
+
+    @classmethod
+    def ids(cls):
+        return ModelQuery(cls).ids()
+
+    @classmethod
+    def insert_all(cls, rows):
+        base = _base(cls)
+        timestamps = _timestamps(base, 'created_at', 'updated_at')
+        rows = [{**timestamps, **row} for row in rows]
+        if rows:
+            _changed(base)
+            session.execute(insert(base), rows)
+        return len(rows)
+
+    @classmethod
+    def upsert_all(cls, rows, unique_by='id'):
+        base = _base(cls)
+        unique_by = [unique_by] if isinstance(unique_by, str) else list(unique_by)
+        timestamps = _timestamps(base, 'created_at', 'updated_at')
+        rows = [{**timestamps, **row} for row in rows]
+        if rows:
+            # Records matched by other unique_by columns are left to the table version
+            _uncache_records(cls, [row['id'] for row in rows if 'id' in row])
+            _changed(base)
+            session.execute(_upsert_statement(base, rows, unique_by))
+        return len(rows)
+
     def update(self, **kwargs):
         for field, value in kwargs.items():
             setattr(self, field, value)
@@ -577,31 +1228,82 @@ class Model(metaclass=ModelMeta):
 
     def save(self, validate=True):
         if validate:
-            validate_rules = registry.get(self.__class__).get('validates') or []
+            validate_rules = registry.compiled(self.__class__).get('validates') or []
             self._errors = Errors()
             for vr in validate_rules:
                 self._errors.extend(vr(instance=self))
             if self._errors:
                 return False
 
+        persisted = self.is_persisted()
+        before = _counter_keys(self) if persisted else {}
+        touched_before = _touch_keys(self) if persisted else {}
         for field, value in self._changes.items():
             setattr(self._base_instance, field, value)
-        self._changes.clear()
+        self._changes = _EMPTY
 
         now = datetime.now(timezone.utc)
         if not self.is_persisted():
             self._base_instance.created_at = now
             session.add(self._base_instance)
         self._base_instance.updated_at = now
+        _changed(self._base_instance.__class__)
+        # Records cascaded by the flush (e.g. created through has_many) change their tables too
+        touch_tables(*_pending_tables())
         session.flush()
+        _update_counters(self, before, _counter_keys(self))
+        _touch_parents(self, touched_before, _touch_keys(self))
+        if persisted:
+            _uncache_records(self.__class__, [self.id])
         return True
 
+    def touch(self):
+        self._base_instance.updated_at = datetime.now(timezone.utc)
+        _changed(self._base_instance.__class__)
+        session.flush()
+        _touch_parents(self, {}, _touch_keys(self))
+        _uncache_records(self.__class__, [self.id])
+
+    @property
+    def cache_key(self):
+        table = self._base_instance.__table__.name
+        return f'{table}/{self.id}' if self.is_persisted() else f'{table}/new'
+
+    @property
+    def cache_version(self):
+        updated_at = getattr(self._base_instance, 'updated_at', None)
+        return updated_at.strftime('%Y%m%d%H%M%S%f') if updated_at else None
+
     def is_persisted(self):
         return inspect(self._base_instance).persistent
 
     def destroy(self):
+        before = _counter_keys(self)
+        touched_before = _touch_keys(self)
         session.delete(self._base_instance)
+        _changed(self._base_instance.__class__, cascade=True)
         session.flush()
+        _update_counters(self, before, {})
+        _touch_parents(self, touched_before, {})
+        _uncache_records(self.__class__, [self.id])
+
+    @classmethod
+    def reset_counters(cls):
+        base = _base(cls)
+        _uncache_records(cls, cls.all()._cached_ids())
+        _changed(base)
+        for model in (registry.get(Model).get('models') or {}).values():
+            counters = registry.compiled(model).get('counter_caches') or {}
+            for fk_name, counter in counters.items():
+                if counter['class'] is not cls:
+                    continue
+                related_base = _base(model)
+                count = (
+                    select(func.count())
+                    .where(getattr(related_base, fk_name) == base.id)
+                    .scalar_subquery()
+                )
+                session.execute(update(base).values({counter['column']: count}))
 
     def __repr__(self) -> str:
         values = {c: getattr(self._base_instance, c) for c in self.column_names}
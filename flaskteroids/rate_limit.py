@@ -1,7 +1,11 @@
+import math
+import time
+from typing import NamedTuple, Any
 from http import HTTPStatus
-from flask import request, abort
+from flask import request, abort, after_this_request, has_request_context
 from flaskteroids.actions import before_action
-from flaskteroids import cache
+from flaskteroids.exceptions import ProgrammerError
+from flaskteroids import cache, registry
 
 
 def _keygen():
@@ -12,15 +16,147 @@ def _with():
     abort(HTTPStatus.TOO_MANY_REQUESTS)
 
 
-def rate_limit(*, to, within=None, only=None, by=None, with_=None):
+class _Result(NamedTuple):
+    state: Any
+    ttl: float | None
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+def _fixed(state, to, within, now):
+    # The window is part of the state, so expiration is not extended by new hits
+    window = int(now // within) if within else 0
+    count = state[1] if state is not cache.MISSING and state[0] == window else 0
+    if count >= to:
+        reset = (window + 1) * within - now if within else 0
+        return _Result(state, within, False, 0, reset)
+    return _Result((window, count + 1), within, True, to - count - 1, 0)
+
+
+def _sliding_counter(state, to, within, now):
+    # Approximates a sliding window weighting the previous fixed window count
+    window = int(now // within)
+    count, previous = 0, 0
+    if state is not cache.MISSING:
+        last_window, last_count, last_previous = state
+        if last_window == window:
+            count, previous = last_count, last_previous
+        elif last_window == window - 1:
+            previous = last_count
+    elapsed = (now - window * within) / within
+    estimated = previous * (1 - elapsed) + count + 1
+    if estimated > to:
+        if count >= to or not previous:
+            retry_after = (1 - elapsed) * within
+        else:
+            # Time until the previous window weight leaves room for this hit
+            retry_after = (1 - (to - count - 1) / previous - elapsed) * within
+        return _Result(state, 2 * within, False, 0, max(0, retry_after))
+    return _Result((window, count + 1, previous), 2 * within, True, math.floor(to - estimated), 0)
+
+
+def _sliding_log(state, to, within, now):
+    # Memory per key is bounded by the limit
+    log = [] if state is cache.MISSING else [t for t in state if t > now - within]
+    if len(log) >= to:
+        return _Result(state, within, False, 0, log[0] + within - now)
+    return _Result([*log, now], within, True, to - len(log) - 1, 0)
+
+
+def _token_bucket(state, to, within, now):
+    rate = to / within
+    tokens, last = (to, now) if state is cache.MISSING else state
+    tokens = min(to, tokens + (now - last) * rate)
+    if tokens < 1:
+        return _Result(state, within, False, 0, (1 - tokens) / rate)
+    return _Result((tokens - 1, now), within, True, math.floor(tokens - 1), 0)
+
+
+_algorithms = {
+    'fixed': _fixed,
+    'sliding_counter': _sliding_counter,
+    'sliding_log': _sliding_log,
+    'token_bucket': _token_bucket,
+}
+
+
+def _key(cls, action, limit):
+    match limit['scope']:
+        case 'action':
+            scope = f'{cls.__name__}#{action}'
+        case 'controller':
+            scope = cls.__name__
+        case _:
+            scope = limit['scope']
+    keygen = limit['by'] or _keygen
+    return f"rate-limit:{scope}:{limit['algorithm']}:{limit['to']}/{limit['within']}:{keygen()}"
+
+
+def _check(keys, limits):
+    now = time.time()
+
+    def apply(states):
+        results = [
+            _algorithms[limit['algorithm']](states[key], limit['to'], limit['within'], now)
+            for key, limit in zip(keys, limits)
+        ]
+        # Hits are only counted when all the limits allow them
+        if not all(r.allowed for r in results):
+            return {}, results
+        return {key: (r.state, r.ttl) for key, r in zip(keys, results)}, results
+
+    return cache.update_multi(keys, apply)
+
+
+def _set_headers(limits, results):
+    if not has_request_context():
+        return
+    # The most restrictive limit is the one reported
+    limit, result = min(zip(limits, results), key=lambda lr: (lr[1].allowed, lr[1].remaining))
+    retry_after = max(r.retry_after for r in results if not r.allowed) if not result.allowed else 0
+
+    @after_this_request
+    def _(response):
+        response.headers['X-RateLimit-Limit'] = str(limit['to'])
+        response.headers['X-RateLimit-Remaining'] = str(max(0, result.remaining))
+        if retry_after:
+            response.headers['Retry-After'] = str(math.ceil(retry_after))
+        return response
+
+
+def rate_limit(*, to, within=None, only=None, by=None, with_=None, algorithm='fixed', scope='action'):
+    if algorithm not in _algorithms:
+        raise ProgrammerError(f'Rate limit algorithm <{algorithm}> is not supported')
+    if algorithm != 'fixed' and not within:
+        raise ProgrammerError(f'Rate limit algorithm <{algorithm}> requires a time window (within)')
+
     def bind(cls):
-        def _rate_limit(self):
-            rate_limit_handler = with_ or _with
-            keygen = by or _keygen
-            key = f'rate-limit:{keygen()}'
-            count = cache.increment(key, within)
-            if count > to:
-                return rate_limit_handler()
-        cls._rate_limit = _rate_limit
-        before_action('_rate_limit', only=only)(cls)
+        ns = registry.get(cls)
+        # Decided on the class itself, its namespace may be left over by a discarded class
+        if '_rate_limit' not in cls.__dict__:
+            ns['rate_limits'] = []
+
+            def _rate_limit(self):
+                action = self.action_name
+                limits = [lm for lm in ns['rate_limits'] if lm['only'] is None or action in lm['only']]
+                if not limits:
+                    return
+                keys = [_key(cls, action, lm) for lm in limits]
+                results = _check(keys, limits)
+                _set_headers(limits, results)
+                for limit, result in zip(limits, results):
+                    if not result.allowed:
+                        return (limit['with_'] or _with)()
+            cls._rate_limit = _rate_limit
+            before_action('_rate_limit')(cls)
+        ns['rate_limits'].append({
+            'to': to,
+            'within': within,
+            'only': only,
+            'by': by,
+            'with_': with_,
+            'algorithm': algorithm,
+            'scope': scope,
+        })
     return bind
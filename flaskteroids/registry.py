@@ -1,18 +1,35 @@
-_registry = {}
+from types import MappingProxyType
+from weakref import WeakKeyDictionary
+
+# Keyed by the class object itself, so classes defined multiple times with the
+# same qualname (e.g., nested classes in tests) never share state, and entries
+# go away with their classes.
+_registry = WeakKeyDictionary()
+_compiled = WeakKeyDictionary()
 
 
 def get(cls) -> dict:
-    namespace = _get_namespace(cls)
-    if namespace not in _registry:
-        _registry[namespace] = {}
-    return _registry[namespace]
+    """Mutable namespace of cls. Meant to be used while binding rules"""
+    ns = _registry.get(cls)
+    if ns is None:
+        ns = _registry[cls] = {}
+    # The namespace may be modified by the caller
+    _compiled.pop(cls, None)
+    return ns
 
 
-def _get_namespace(cls):
-    # Use class identity to avoid namespace collisions for classes defined
-    # multiple times (e.g., nested classes in tests). Qualname alone can be
-    # the same across different class objects, which caused shared registry
-    # state and flaky tests. Including the object's id ensures a unique
-    # namespace per class object.
-    ns = f'{cls.__module__}.{cls.__qualname__}.{id(cls)}'
-    return ns
+def compiled(cls) -> MappingProxyType:
+    """Read-only snapshot of the namespace of cls, for lookups on hot paths"""
+    view = _compiled.get(cls)
+    if view is None:
+        ns = _registry.get(cls) or {}
+        view = _compiled[cls] = MappingProxyType({k: _freeze(v) for k, v in ns.items()})
+    return view
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return MappingProxyType(dict(value))
+    return value
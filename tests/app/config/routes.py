@@ -1,6 +1,7 @@
 def register(route):
     route.get('/up/', to="flaskteroids/health#show")
     route.get('/users/', to="users#index")
+    route.get('/users/export/', to="users#export")
     route.get('/users/<int:id>/', to="users#show")
     route.get('/users/new/', to="users#new")
     route.post('/users/', to="users#create")
@@ -18,6 +18,9 @@ class UsersController(ActionController):
     def show(self):
         pass
 
+    def export(self):
+        return render(json=User.all(), stream=True)
+
     def new(self):
         self.user = User.new()
 
@@ -0,0 +1,187 @@
+import pytest
+from multiprocessing import get_context
+from flaskteroids.cache.base import Cache, MISSING
+from flaskteroids.cache.factory import create_cache, register_backend
+from flaskteroids.cache.inmemory import InMemoryCache
+from flaskteroids.cache.sqlite import SQLiteCache
+from flaskteroids.exceptions import ProgrammerError
+
+
+@pytest.fixture(params=['inmemory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteCache(path=tmp_path / 'cache.db')
+    return InMemoryCache()
+
+
+def test_store_and_fetch(backend):
+    backend.store('key', {'a': 1})
+    assert backend.fetch('key') == {'a': 1}
+
+
+def test_fetch_missing(backend):
+    assert backend.fetch('key') is MISSING
+
+
+def test_fetch_expired(backend, mocker):
+    backend.store('key', 'value', ttl=10)
+    time = mocker.patch('time.time')
+    time.return_value = 10 ** 12
+    assert backend.fetch('key') is MISSING
+
+
+def test_fetch_multi(backend):
+    backend.store('one', 1)
+    backend.store('two', 2, ttl=10)
+    assert backend.fetch_multi(['one', 'two', 'three']) == {'one': 1, 'two': 2}
+
+
+def test_fetch_multi_skips_expired(backend, mocker):
+    backend.store('one', 1)
+    backend.store('two', 2, ttl=10)
+    time = mocker.patch('time.time')
+    time.return_value = 10 ** 12
+    assert backend.fetch_multi(['one', 'two']) == {'one': 1}
+
+
+def test_fetch_multi_many_keys(backend):
+    backend.store_multi({f'key-{i}': i for i in range(1200)})
+    assert len(backend.fetch_multi(f'key-{i}' for i in range(1500))) == 1200
+
+
+def test_store_multi(backend):
+    backend.store_multi({'one': 1, 'two': 2}, ttl=10)
+    assert backend.fetch('one') == 1
+    assert backend.fetch('two') == 2
+
+
+def test_increment(backend):
+    assert backend.increment('counter') == 1
+    assert backend.increment('counter') == 2
+
+
+def test_increment_amount(backend):
+    assert backend.increment('counter', amount=5) == 5
+    assert backend.decrement('counter', amount=2) == 3
+    assert backend.decrement('counter') == 2
+
+
+def test_add(backend):
+    assert backend.add('key', 'one')
+    assert not backend.add('key', 'two')
+    assert backend.fetch('key') == 'one'
+
+
+def test_add_expired(backend, mocker):
+    backend.store('key', 'one', ttl=10)
+    mocker.patch('time.time', return_value=10 ** 12)
+    assert backend.add('key', 'two')
+    assert backend.fetch('key') == 'two'
+
+
+def test_compare_and_set(backend):
+    assert backend.compare_and_set('key', MISSING, 1)
+    assert not backend.compare_and_set('key', MISSING, 2)
+    assert not backend.compare_and_set('key', 2, 3)
+    assert backend.compare_and_set('key', 1, 3)
+    assert backend.fetch('key') == 3
+
+
+def test_compare_and_delete(backend):
+    backend.store('key', 1)
+    assert not backend.compare_and_delete('key', 2)
+    assert backend.fetch('key') == 1
+    assert backend.compare_and_delete('key', 1)
+    assert backend.fetch('key') is MISSING
+    assert not backend.compare_and_delete('key', 1)
+
+
+def test_update_multi(backend):
+    backend.store('one', 1)
+
+    def fn(current):
+        assert current == {'one': 1, 'two': MISSING}
+        return {'one': (2, None), 'two': (3, 10)}, 'result'
+
+    assert backend.update_multi(['one', 'two'], fn) == 'result'
+    assert backend.fetch('one') == 2
+    assert backend.fetch('two') == 3
+
+
+def test_delete(backend):
+    backend.store('key', 'value')
+    backend.delete('key')
+    assert backend.fetch('key') is MISSING
+
+
+def test_sqlite_sweeps_expired_entries(tmp_path, mocker):
+    cache = SQLiteCache(path=tmp_path / 'cache.db', sweep_every=3)
+    cache.store('one', 1, ttl=10)
+    cache.store('two', 2)
+    mocker.patch('time.time', return_value=10 ** 12)
+    cache.store('three', 3)
+    rows = cache._connection().execute('SELECT key FROM cache_entries ORDER BY key').fetchall()
+    assert rows == [('three',), ('two',)]
+
+
+def test_sqlite_max_entries(tmp_path):
+    cache = SQLiteCache(path=tmp_path / 'cache.db', max_entries=2, sweep_every=None)
+    cache.store('one', 1)
+    cache.store('two', 2)
+    cache.store('three', 3)
+    cache.store('one', 1)
+    assert cache.sweep() == 1
+    assert cache.fetch('two') is MISSING
+    assert cache.fetch_multi(['one', 'three']) == {'one': 1, 'three': 3}
+
+
+def _increment_many(path, times):
+    cache = SQLiteCache(path=path)
+    for _ in range(times):
+        cache.increment('counter')
+
+
+def test_sqlite_shared_across_processes(tmp_path):
+    path = tmp_path / 'cache.db'
+    ctx = get_context('spawn')
+    processes = [ctx.Process(target=_increment_many, args=(path, 25)) for _ in range(4)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    assert SQLiteCache(path=path).fetch('counter') == 100
+
+
+class TestFactory:
+
+    def test_default_backend(self):
+        assert isinstance(create_cache(), InMemoryCache)
+
+    def test_backend_options(self, tmp_path):
+        cache = create_cache({'BACKEND': 'sqlite', 'OPTIONS': {'path': tmp_path / 'cache.db'}})
+        assert isinstance(cache, SQLiteCache)
+
+    def test_backend_import_path(self):
+        cache = create_cache({'BACKEND': 'flaskteroids.cache.inmemory.InMemoryCache'})
+        assert isinstance(cache, InMemoryCache)
+
+    def test_register_backend(self):
+        class CustomCache(InMemoryCache):
+            pass
+
+        register_backend('custom', CustomCache)
+        assert isinstance(create_cache({'BACKEND': 'custom'}), CustomCache)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ProgrammerError):
+            create_cache({'BACKEND': 'unknown'})
+
+    def test_invalid_backend(self):
+        with pytest.raises(ProgrammerError):
+            create_cache({'BACKEND': 'flaskteroids.cache.base.MISSING'})
+
+    @pytest.mark.usefixtures('app_ctx')
+    def test_app_cache(self, app):
+        from flaskteroids.cache.factory import get_cache
+        assert isinstance(get_cache(), Cache)
+        assert get_cache() is app.extensions['flaskteroids.cache'].cache
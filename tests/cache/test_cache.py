@@ -1,4 +1,8 @@
+import time
+import threading
+import pytest
 from flaskteroids import cache
+from flaskteroids.cache.memoize import Entry
 
 
 def test_cache(mocker):
@@ -15,3 +19,117 @@ def test_cache(mocker):
     value = expensive_call()
     assert value == 12345
     assert mock.call.call_count == 1
+
+
+def test_cache_single_flight(mocker):
+    mock = mocker.Mock()
+
+    @cache.value('single-flight-key', ttl=30, single_flight=True)
+    def expensive_call():
+        mock.call()
+        time.sleep(0.2)
+        return 12345
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(expensive_call())) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [12345] * 5
+    assert mock.call.call_count == 1
+
+
+def test_cache_single_flight_keeps_lock_taken_by_others():
+
+    @cache.value('single-flight-expired-lock', ttl=30, single_flight=True)
+    def expensive_call():
+        # Our lock expired and another caller took it while computing
+        cache.store('single-flight-expired-lock:lock', 'other')
+        return 12345
+
+    assert expensive_call() == 12345
+    assert cache.fetch('single-flight-expired-lock:lock') == 'other'
+
+
+@pytest.mark.parametrize('rand, expected_calls', [
+    (0.0, 0),
+    (0.99, 1),
+])
+def test_cache_early_expiration(mocker, rand, expected_calls):
+    mock = mocker.Mock()
+
+    @cache.value(f'early-expiration-key-{rand}', ttl=30, early_expiration=1.0)
+    def expensive_call():
+        mock.call()
+        return 12345
+
+    cache.store(f'early-expiration-key-{rand}', Entry(12345, 100, time.time() + 10), 30)
+    mocker.patch('flaskteroids.cache.memoize.random.random', return_value=rand)
+    assert expensive_call() == 12345
+    assert mock.call.call_count == expected_calls
+
+
+def test_cache_key_template(mocker):
+    mock = mocker.Mock()
+
+    @cache.value('top-posts:{user_id}:{limit}', ttl=30)
+    def top_posts(user_id, limit=10):
+        mock.call(user_id)
+        return [user_id] * limit
+
+    assert top_posts(1) == [1] * 10
+    assert top_posts(user_id=1) == [1] * 10
+    assert top_posts(2, limit=2) == [2, 2]
+    assert mock.call.call_count == 2
+    assert cache.fetch('top-posts:1:10') is not cache.MISSING
+
+
+def test_cache_key_function(mocker):
+    mock = mocker.Mock()
+
+    @cache.value(lambda user_id: f'key-function:{user_id}', ttl=30)
+    def posts(user_id):
+        mock.call(user_id)
+        return user_id
+
+    assert posts(1) == 1
+    assert posts(1) == 1
+    assert posts(2) == 2
+    assert mock.call.call_count == 2
+
+
+def test_cache_invalidate(mocker):
+    mock = mocker.Mock()
+
+    @cache.value('invalidate:{user_id}', ttl=30)
+    def posts(user_id):
+        mock.call(user_id)
+        return user_id
+
+    posts(1)
+    posts(2)
+    posts.invalidate(1)
+    posts(1)
+    posts(2)
+    assert mock.call.call_count == 3
+
+
+def test_cache_stale_while_revalidate(mocker):
+    calls = []
+    refreshed = threading.Event()
+
+    @cache.value('stale-key', ttl=30, stale_ttl=60)
+    def expensive_call():
+        calls.append(1)
+        if len(calls) > 1:
+            refreshed.set()
+        return len(calls)
+
+    assert expensive_call() == 1
+    mocker.patch('flaskteroids.cache.memoize.time.time', return_value=time.time() + 40)
+    assert expensive_call() == 1
+    assert refreshed.wait(2)
+    time.sleep(0.05)
+    assert expensive_call() == 2
+    assert len(calls) == 2
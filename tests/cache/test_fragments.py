@@ -0,0 +1,77 @@
+import pytest
+from jinja2 import Environment, DictLoader
+from markupsafe import Markup
+from flaskteroids.cache.fragments import FragmentCacheExtension
+
+pytestmark = pytest.mark.usefixtures('cache')
+
+
+class Record:
+    def __init__(self, id, version):
+        self.cache_key = f'records/{id}'
+        self.cache_version = version
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return Markup(f'<b>{self.calls}</b>')
+
+
+def _env(**templates):
+    return Environment(loader=DictLoader(templates), autoescape=True, extensions=[FragmentCacheExtension])
+
+
+def test_caches_fragments():
+    env = _env(page='{% cache record %}{{ counter() }}{% endcache %}')
+    counter = Counter()
+    record = Record(1, 'v1')
+    assert env.get_template('page').render(record=record, counter=counter) == '<b>1</b>'
+    assert env.get_template('page').render(record=record, counter=counter) == '<b>1</b>'
+    assert counter.calls == 1
+
+
+def test_new_versions_render_again():
+    env = _env(page='{% cache record %}{{ counter() }}{% endcache %}')
+    counter = Counter()
+    env.get_template('page').render(record=Record(1, 'v1'), counter=counter)
+    assert env.get_template('page').render(record=Record(1, 'v2'), counter=counter) == '<b>2</b>'
+    assert env.get_template('page').render(record=Record(2, 'v1'), counter=counter) == '<b>3</b>'
+
+
+def test_several_keys_and_ttl(cache, mocker):
+    store = mocker.spy(cache, 'store')
+    env = _env(page="{% cache record, 'sidebar', ttl=60 %}{{ counter() }}{% endcache %}")
+    env.get_template('page').render(record=Record(1, 'v1'), counter=Counter())
+    key, html, ttl = store.call_args.args
+    assert key.endswith('/records/1-v1/sidebar')
+    assert (html, ttl) == ('<b>1</b>', 60)
+
+
+def test_different_blocks_do_not_share_entries():
+    env = _env(
+        one='{% cache record %}one{% endcache %}',
+        two='{% cache record %}two{% endcache %}'
+    )
+    record = Record(1, 'v1')
+    assert env.get_template('one').render(record=record) == 'one'
+    assert env.get_template('two').render(record=record) == 'two'
+
+
+def test_nested_fragments():
+    env = _env(page=(
+        '{% cache post %}[{{ counter() }}'
+        '{% for comment in comments %}{% cache comment %}{{ counter() }}{% endcache %}{% endfor %}'
+        ']{% endcache %}'
+    ))
+    counter = Counter()
+    comments = [Record(1, 'v1'), Record(2, 'v1')]
+    assert env.get_template('page').render(post=Record(1, 'v1'), comments=comments, counter=counter) == \
+        '[<b>1</b><b>2</b><b>3</b>]'
+    comments[1] = Record(2, 'v2')
+    # Touching the post renders it again, reusing the fragments of unchanged comments
+    assert env.get_template('page').render(post=Record(1, 'v2'), comments=comments, counter=counter) == \
+        '[<b>4</b><b>2</b><b>5</b>]'
@@ -0,0 +1,133 @@
+import pytest
+import threading
+from flaskteroids.cache.base import MISSING
+from flaskteroids.cache.inmemory import InMemoryCache
+from flaskteroids.cache.memoize import Entry
+from flaskteroids.exceptions import ProgrammerError
+
+
+def test_lru_eviction():
+    cache = InMemoryCache(max_entries=2, shards=1)
+    cache.store('one', 1)
+    cache.store('two', 2)
+    cache.fetch('one')
+    cache.store('three', 3)
+    assert cache.fetch('one') == 1
+    assert cache.fetch('two') is MISSING
+    assert cache.fetch('three') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_lfu_eviction():
+    cache = InMemoryCache(max_entries=2, policy='lfu', shards=1)
+    cache.store('one', 1)
+    cache.store('two', 2)
+    cache.fetch('one')
+    cache.fetch('one')
+    cache.fetch('two')
+    cache.store('three', 3)
+    assert cache.fetch('one') == 1
+    assert cache.fetch('two') is MISSING
+    assert cache.fetch('three') == 3
+
+
+def test_max_bytes_eviction():
+    cache = InMemoryCache(max_bytes=1000, shards=1)
+    for i in range(100):
+        cache.store(f'key-{i}', 'x' * 100)
+    stats = cache.stats()
+    assert stats['bytes'] <= 1000
+    assert stats['evictions'] > 0
+    assert cache.fetch('key-99') == 'x' * 100
+
+
+def test_max_bytes_counts_nested_values():
+    cache = InMemoryCache(max_bytes=10000, shards=1)
+    for i in range(50):
+        cache.store(f'key-{i}', Entry(['x' * 1000] * 5, 0.1, None))
+    stats = cache.stats()
+    assert stats['bytes'] <= 10000
+    assert stats['entries'] < 10
+    assert stats['evictions'] > 40
+
+
+def test_values_bigger_than_max_bytes_are_not_stored():
+    cache = InMemoryCache(max_bytes=1000, shards=1)
+    for i in range(5):
+        cache.store(f'key-{i}', 'x')
+    cache.store('key-0', 'x' * 2000)
+    cache.store('big', 'x' * 2000)
+    stats = cache.stats()
+    assert stats['entries'] == 4
+    assert stats['evictions'] == 0
+    assert cache.fetch('key-0') is MISSING
+    assert cache.fetch('big') is MISSING
+
+
+def test_unknown_policy():
+    with pytest.raises(ProgrammerError):
+        InMemoryCache(policy='unknown')
+
+
+def test_expired_entries_are_removed_on_fetch(mocker):
+    cache = InMemoryCache()
+    cache.store('key', 'value', ttl=10)
+    mocker.patch('time.time', return_value=10 ** 12)
+    assert cache.fetch('key') is MISSING
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['expirations'] == 1
+
+
+def test_sweep(mocker):
+    cache = InMemoryCache()
+    cache.store('one', 1, ttl=10)
+    cache.store('two', 2, ttl=10)
+    cache.store('three', 3)
+    mocker.patch('time.time', return_value=10 ** 12)
+    assert cache.sweep() == 2
+    assert cache.stats()['entries'] == 1
+
+
+def test_background_sweeper(mocker):
+    cache = InMemoryCache(sweep_interval=0.01)
+    cache.store('key', 'value', ttl=0.01)
+    sweep = mocker.spy(cache, 'sweep')
+    import time
+    deadline = time.monotonic() + 2
+    while not sweep.call_count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sweep.call_count
+    assert cache.stats()['entries'] == 0
+
+
+def test_stats():
+    cache = InMemoryCache()
+    cache.store('key', 'value')
+    cache.fetch('key')
+    cache.fetch('other')
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['entries'] == 1
+
+
+def test_limits_are_split_between_shards():
+    cache = InMemoryCache(max_entries=64, shards=4)
+    for i in range(1000):
+        cache.store(f'key-{i}', i)
+    assert cache.stats()['entries'] <= 64
+
+
+def test_concurrent_increments():
+    cache = InMemoryCache()
+
+    def increment_many():
+        for _ in range(1000):
+            cache.increment('counter')
+
+    threads = [threading.Thread(target=increment_many) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.fetch('counter') == 8000
@@ -20,3 +20,16 @@ def test_migrate(cli_runner, command):
 def test_rollback(cli_runner, command):
     cli_runner.invoke(args='db:rollback')
     command.downgrade.assert_called()
+
+
+def test_reset_counters(app, cli_runner, mocker):
+    models = app.extensions['flaskteroids.db'].models
+    reset_counters = mocker.patch.object(models['User'], 'reset_counters')
+    result = cli_runner.invoke(args=['db:reset_counters', 'User'])
+    assert result.exit_code == 0
+    reset_counters.assert_called_once()
+
+
+def test_reset_counters_unknown_model(cli_runner):
+    result = cli_runner.invoke(args=['db:reset_counters', 'Unknown'])
+    assert result.exit_code != 0
@@ -1,5 +1,7 @@
 from sqlalchemy import create_engine
 from flaskteroids.app import create_app
+import flaskteroids.cache.factory as factory
+from flaskteroids.cache.inmemory import InMemoryCache
 import pytest
 
 
@@ -71,3 +73,10 @@ def client(app):
 @pytest.fixture
 def cli_runner(app):
     return app.test_cli_runner()
+
+
+@pytest.fixture
+def cache(mocker):
+    cache = InMemoryCache()
+    mocker.patch.object(factory, '_default_cache', cache)
+    return cache
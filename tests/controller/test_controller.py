@@ -1,7 +1,8 @@
 import pytest
 from flaskteroids import params
 from flaskteroids.actions import after_action, around_action, before_action
-from flaskteroids.controller import ActionController, init
+from flaskteroids.controller import ActionController, init, render
+from flaskteroids.db import query_cache
 from flaskteroids.rules import rules
 
 
@@ -61,3 +62,45 @@ def test_controller_flow(my_controller, render_template):
         'after_second'
     ]
     render_template.assert_called_with('test/action.html', calls=calls, params=params)
+
+
+@pytest.mark.usefixtures('app_ctx')
+def test_callbacks_are_resolved_on_init(my_controller, mocker):
+    get = mocker.patch('flaskteroids.actions.registry.get')
+    my_controller().action()
+    get.assert_not_called()
+
+
+@pytest.mark.usefixtures('app_ctx')
+def test_actions_enable_the_query_cache(my_controller):
+    assert query_cache() is None
+    my_controller().action()
+    assert query_cache() is not None
+
+
+def test_query_cache_can_be_disabled(app, my_controller):
+    app.config['DB'] = {**app.config['DB'], 'QUERY_CACHE': False}
+    with app.app_context():
+        my_controller().action()
+        assert query_cache() is None
+
+
+class _Query:
+    def stream_json(self, batch_size):
+        yield [{'id': 1}, {'id': 2}]
+        yield []
+        yield [{'id': 3}]
+
+    def __json__(self):
+        return [{'id': 1}, {'id': 2}, {'id': 3}]
+
+
+@pytest.mark.parametrize('stream, mimetype, body', [
+    (True, 'application/json', b'[{"id": 1},{"id": 2},{"id": 3}]'),
+    ('ndjson', 'application/x-ndjson', b'{"id": 1}\n{"id": 2}\n{"id": 3}\n'),
+])
+def test_render_json_stream(app, stream, mimetype, body):
+    with app.test_request_context():
+        res = render(json=_Query(), stream=stream)
+        assert res.mimetype == mimetype
+        assert res.get_data() == body
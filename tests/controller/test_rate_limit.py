@@ -4,6 +4,7 @@ from werkzeug.exceptions import HTTPException
 from flaskteroids.rate_limit import rate_limit
 from flaskteroids.controller import ActionController, init
 from flaskteroids.rules import rules
+from flaskteroids.exceptions import ProgrammerError
 
 
 @pytest.fixture(autouse=True)
@@ -40,3 +41,168 @@ def test_rate_limit(rate_limited_controller):
         controller.index()
 
     assert e.value.code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+@pytest.fixture()
+def now(mocker):
+    now = mocker.patch('flaskteroids.rate_limit.time.time')
+    now.return_value = 1_000_000.0
+    return now
+
+
+def _controller(**kwargs):
+    @rules(
+        rate_limit(to=5, within=60, **kwargs),
+    )
+    class TestController(ActionController):
+
+        def index(self):
+            pass
+
+    return init(TestController)
+
+
+def _hits(controller, times):
+    return _hits_on(controller.index, times)
+
+
+def _hits_on(action, times):
+    allowed = 0
+    for _ in range(times):
+        try:
+            action()
+            allowed += 1
+        except HTTPException as e:
+            assert e.code == HTTPStatus.TOO_MANY_REQUESTS
+    return allowed
+
+
+@pytest.mark.usefixtures('app_ctx')
+@pytest.mark.parametrize('algorithm', ['fixed', 'sliding_counter', 'sliding_log', 'token_bucket'])
+def test_rate_limit_algorithms(now, algorithm):
+    controller = _controller(algorithm=algorithm)()
+    assert _hits(controller, 10) == 5
+    now.return_value += 121
+    assert _hits(controller, 10) == 5
+
+
+@pytest.mark.usefixtures('app_ctx')
+def test_fixed_window_is_not_extended_by_hits(now):
+    controller = _controller(algorithm='fixed')()
+    now.return_value = 1_000_020.0
+    assert _hits(controller, 5) == 5
+    for _ in range(5):
+        now.return_value += 10
+        assert _hits(controller, 1) == 0
+    now.return_value = 1_000_080.0
+    assert _hits(controller, 1) == 1
+
+
+@pytest.mark.usefixtures('app_ctx')
+def test_sliding_log_does_not_allow_bursts_at_window_edges(now):
+    controller = _controller(algorithm='sliding_log')()
+    now.return_value = 1_000_059.0
+    assert _hits(controller, 5) == 5
+    now.return_value = 1_000_061.0
+    assert _hits(controller, 5) == 0
+    now.return_value = 1_000_120.0
+    assert _hits(controller, 5) == 5
+
+
+@pytest.mark.usefixtures('app_ctx')
+def test_token_bucket_refills(now):
+    controller = _controller(algorithm='token_bucket')()
+    assert _hits(controller, 5) == 5
+    now.return_value += 12
+    assert _hits(controller, 5) == 1
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ProgrammerError):
+        rate_limit(to=5, within=60, algorithm='unknown')
+
+
+def test_algorithm_requires_window():
+    with pytest.raises(ProgrammerError):
+        rate_limit(to=5, algorithm='token_bucket')
+
+
+def test_rate_limit_headers(app, now):
+    controller_cls = _controller(algorithm='sliding_log')
+    with app.test_request_context():
+        controller_cls().index()
+        res = app.process_response(app.make_response(''))
+    assert res.headers['X-RateLimit-Limit'] == '5'
+    assert res.headers['X-RateLimit-Remaining'] == '4'
+    assert 'Retry-After' not in res.headers
+
+    with app.test_request_context():
+        for _ in range(4):
+            controller_cls().index()
+    now.return_value += 30
+    with app.test_request_context():
+        with pytest.raises(HTTPException):
+            controller_cls().index()
+        res = app.process_response(app.make_response(''))
+    assert res.headers['X-RateLimit-Remaining'] == '0'
+    assert res.headers['Retry-After'] == '30'
+
+
+@pytest.mark.usefixtures('app_ctx')
+def test_rate_limit_is_scoped_by_action(now):
+    @rules(
+        rate_limit(to=2, within=60),
+    )
+    class TestController(ActionController):
+
+        def index(self):
+            pass
+
+        def show(self):
+            pass
+
+    controller = init(TestController)()
+    assert _hits(controller, 5) == 2
+    assert _hits_on(controller.show, 5) == 2
+
+
+@pytest.mark.usefixtures('app_ctx')
+def test_rate_limit_scoped_by_controller(now):
+    @rules(
+        rate_limit(to=2, within=60, scope='controller'),
+    )
+    class TestController(ActionController):
+
+        def index(self):
+            pass
+
+        def show(self):
+            pass
+
+    controller = init(TestController)()
+    assert _hits(controller, 5) == 2
+    assert _hits_on(controller.show, 5) == 0
+
+
+@pytest.mark.usefixtures('app_ctx')
+def test_stacked_rate_limits(now):
+    @rules(
+        rate_limit(to=2, within=1),
+        rate_limit(to=3, within=3600),
+        rate_limit(to=1, within=60, only=['show']),
+    )
+    class TestController(ActionController):
+
+        def index(self):
+            pass
+
+        def show(self):
+            pass
+
+    controller = init(TestController)()
+    assert _hits(controller, 5) == 2
+    now.return_value += 1
+    assert _hits(controller, 5) == 1
+    now.return_value += 1
+    assert _hits(controller, 5) == 0
+    assert _hits_on(controller.show, 5) == 1
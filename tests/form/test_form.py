@@ -50,3 +50,15 @@ def test_collection_select():
     assert '<option value="CA" selected>' in select_html
     assert 'Canada' in select_html
     assert 'United States' in select_html
+
+
+def test_collection_select_plucks_queries():
+    class Query:
+        def pluck(self, *columns):
+            assert columns == ('id', 'name')
+            return [('US', 'United States'), ('CA', 'Canada')]
+
+    form = Form(prefix="user", data={"country": "CA"})
+    select_html = str(form.collection_select("country", Query(), "id", "name"))
+    assert '<option value="CA" selected>' in select_html
+    assert 'United States' in select_html
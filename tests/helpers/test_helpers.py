@@ -1,5 +1,5 @@
 import pytest
-from flaskteroids.helpers import link_to, button_to, form_with, render, csrf_token
+from flaskteroids.helpers import link_to, button_to, form_with, render, render_collection, csrf_token
 
 
 @pytest.fixture
@@ -59,3 +59,51 @@ class TestHelpers:
     def test_csrf_token_generates_token(self):
         result = csrf_token()
         assert result
+
+
+class _User:
+    def __init__(self, id, username, version='v1'):
+        self.id = id
+        self.username = username
+        self.cache_key = f'users/{id}'
+        self.cache_version = version
+
+
+@pytest.fixture
+def request_ctx(app):
+    with app.test_request_context():
+        yield
+
+
+@pytest.fixture
+def cache(app):
+    return app.extensions['flaskteroids.cache'].cache
+
+
+@pytest.mark.usefixtures('request_ctx')
+class TestRenderCollection:
+
+    def test_renders_each_element(self):
+        users = [_User(1, 'one'), _User(2, 'two')]
+        result = render_collection('users/_user.html', users, suffix='!')
+        assert str(result) == '<li id="user-1">one!</li><li id="user-2">two!</li>'
+
+    def test_as(self):
+        result = render_collection('users/_user.html', [_User(1, 'one')], as_='user')
+        assert 'one' in str(result)
+
+    def test_empty_collection(self):
+        assert str(render_collection('users/_user.html', [])) == ''
+
+    def test_cached_renders_only_misses(self, cache, mocker):
+        fetch_multi = mocker.spy(cache, 'fetch_multi')
+        render_collection('users/_user.html', [_User(1, 'one')], cached=True)
+        users = [_User(1, 'renamed'), _User(2, 'two')]
+        result = render_collection('users/_user.html', users, cached=True)
+        assert str(result) == '<li id="user-1">one</li><li id="user-2">two</li>'
+        assert fetch_multi.call_count == 2
+
+    def test_cached_new_versions_render_again(self):
+        render_collection('users/_user.html', [_User(1, 'one')], cached=True)
+        result = render_collection('users/_user.html', [_User(1, 'renamed', 'v2')], cached=True)
+        assert 'renamed' in str(result)
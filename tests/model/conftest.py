@@ -1,6 +1,6 @@
 import pytest
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from flaskteroids.model import Model, init
 import flaskteroids.registry as registry
 
@@ -35,3 +35,15 @@ def init_models(engine):
         for _, model in model_base_tuples:
             init(model)
     return _
+
+
+@pytest.fixture
+def statements(engine):
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    yield captured
+    event.remove(engine, 'before_cursor_execute', before_cursor_execute)
@@ -1,6 +1,6 @@
 import pytest
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Integer, String, inspect
 from flaskteroids import model
 from flaskteroids.model import Model, validates, belongs_to, has_many
 from flaskteroids.rules import rules
@@ -106,6 +106,31 @@ def test_destroy():
     assert len([u for u in User.all()]) == 0
 
 
+@pytest.mark.usefixtures('user_groups')
+def test_len_counts_without_loading(engine):
+    group = Group.find_by(name='one')
+    captured_statements = capture_statements(engine, lambda: len(group.users))
+    assert len(captured_statements) == 1
+    assert 'count(' in captured_statements[0]
+    assert 'users' in inspect(group._base_instance).unloaded
+
+
+@pytest.mark.usefixtures('user_groups')
+def test_bool_checks_existence_without_loading(engine):
+    group = Group.find_by(name='one')
+    empty = Group.create(name='empty')
+    assert group.users
+    assert not empty.users
+    assert 'users' in inspect(group._base_instance).unloaded
+
+
+@pytest.mark.usefixtures('user_groups')
+def test_len_uses_loaded_association(engine):
+    group = Group.includes('users').where(name='one').first()
+    captured_statements = capture_statements(engine, lambda: len(group.users))
+    assert len(captured_statements) == 0
+
+
 @pytest.fixture
 def user_groups():
     group_one = Group.create(name='one')
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, Integer, String
+from flaskteroids.model import Model
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [
+        (ItemBase, Item),
+    ])
+
+
+@pytest.fixture(autouse=True)
+def items(init):
+    Item.insert_all([{'name': f'item-{i}', 'even': i % 2 == 0} for i in range(25)])
+
+
+Base = declarative_base()
+
+
+class ItemBase(Base):
+    __tablename__ = 'items'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    name = Column(String())
+    even = Column(Integer())
+
+
+class Item(Model):
+    pass
+
+
+def test_find_in_batches():
+    batches = list(Item.all().find_in_batches(batch_size=10))
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert [i.name for b in batches for i in b] == [f'item-{i}' for i in range(25)]
+
+
+def test_find_in_batches_with_conditions():
+    batches = list(Item.where(even=True).order(name='desc').find_in_batches(batch_size=5))
+    assert [len(b) for b in batches] == [5, 5, 3]
+
+
+def test_find_each_expunges_processed_rows(session):
+    sizes = [len(session.identity_map) for _ in Item.all().find_each(batch_size=10)]
+    assert max(sizes) <= 10
+    assert len(session.identity_map) == 0
+
+
+def test_find_each_keeps_rows_loaded_before(session):
+    first = Item.find(1)
+    list(Item.all().find_each(batch_size=10))
+    assert first._base_instance in session
+
+
+def test_in_batches():
+    batches = list(Item.all().in_batches(batch_size=10))
+    assert len(batches) == 3
+    for batch in batches:
+        batch.update_all(name='updated')
+    assert {i.name for i in Item.all()} == {'updated'}
+
+
+def test_in_batches_with_conditions():
+    for batch in Item.where(even=True).in_batches(batch_size=5):
+        batch.delete_all()
+    assert len(list(Item.all())) == 12
+
+
+def test_stream(session, engine):
+    executions = []
+
+    def capture(conn, clauseelement, multiparams, params, execution_options):
+        executions.append(execution_options)
+
+    from sqlalchemy import event
+    event.listen(engine, 'before_execute', capture)
+    names = [i.name for i in Item.all().stream(batch_size=10)]
+    event.remove(engine, 'before_execute', capture)
+    assert names == [f'item-{i}' for i in range(25)]
+    assert executions[0].get('yield_per') == 10
+    assert len(session.identity_map) == 0
+
+
+def test_stream_json():
+    batches = list(Item.where(even=True).stream_json(batch_size=5))
+    assert [len(b) for b in batches] == [5, 5, 3]
+    assert batches[0][0] == {'id': 1, 'name': 'item-0', 'even': 1}
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, Integer, String, DateTime
+from flaskteroids.model import Model
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [
+        (ProductBase, Product),
+    ])
+
+
+Base = declarative_base()
+
+
+class ProductBase(Base):
+    __tablename__ = 'products'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    code = Column(String(), unique=True)
+    quantity = Column(Integer())
+    created_at = Column(DateTime())
+    updated_at = Column(DateTime())
+
+
+class Product(Model):
+    pass
+
+
+def test_insert_all(statements):
+    Product.insert_all([
+        {'code': 'a', 'quantity': 1},
+        {'code': 'b', 'quantity': 2},
+        {'code': 'c', 'quantity': 3},
+    ])
+    assert len(statements) == 1
+    products = list(Product.all())
+    assert [p.code for p in products] == ['a', 'b', 'c']
+    assert all(p.created_at and p.updated_at for p in products)
+
+
+def test_upsert_all():
+    Product.insert_all([{'code': 'a', 'quantity': 1}])
+    created_at = Product.find_by(code='a').created_at
+    Product.upsert_all([
+        {'code': 'a', 'quantity': 10},
+        {'code': 'b', 'quantity': 20},
+    ], unique_by='code')
+    products = {p.code: p for p in Product.all()}
+    assert products['a'].quantity == 10
+    assert products['a'].created_at == created_at
+    assert products['b'].quantity == 20
+
+
+def test_update_all(statements):
+    Product.insert_all([{'code': c, 'quantity': 1} for c in 'abc'])
+    statements.clear()
+    Product.where(Product.code.in_(['a', 'b'])).update_all(quantity=5)
+    assert len(statements) == 1
+    assert sorted(p.quantity for p in Product.all()) == [1, 5, 5]
+
+
+def test_delete_all(statements):
+    Product.insert_all([{'code': c, 'quantity': 1} for c in 'abc'])
+    statements.clear()
+    Product.where(code='a').delete_all()
+    assert len(statements) == 1
+    assert sorted(p.code for p in Product.all()) == ['b', 'c']
+    assert Product.all().delete_all() == 2
+    assert list(Product.all()) == []
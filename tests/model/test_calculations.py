@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, Integer, String
+from flaskteroids.model import Model
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [
+        (ItemBase, Item),
+    ])
+
+
+@pytest.fixture(autouse=True)
+def items(init):
+    Item.insert_all([{'name': f'item-{i}', 'quantity': i} for i in range(5)])
+
+
+Base = declarative_base()
+
+
+class ItemBase(Base):
+    __tablename__ = 'items'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    name = Column(String())
+    quantity = Column(Integer())
+
+
+class Item(Model):
+    pass
+
+
+def test_limit_and_offset():
+    assert Item.all().order(id='asc').limit(2).offset(1).pluck('name') == ['item-1', 'item-2']
+
+
+def test_count():
+    assert Item.all().count() == 5
+    assert Item.where(Item.quantity > 2).count() == 2
+    assert Item.all().limit(3).count() == 3
+
+
+def test_exists():
+    assert Item.where(name='item-1').exists()
+    assert not Item.where(name='missing').exists()
+
+
+def test_aggregates():
+    query = Item.where(Item.quantity > 0)
+    assert query.sum('quantity') == 10
+    assert query.avg('quantity') == 2.5
+    assert query.min('quantity') == 1
+    assert query.max('quantity') == 4
+
+
+def test_aggregates_honor_limit():
+    assert Item.all().order(quantity='desc').limit(2).sum('quantity') == 7
+
+
+def test_aggregates_without_rows():
+    assert Item.where(name='missing').sum('quantity') is None
+    assert Item.where(name='missing').count() == 0
+
+
+def test_count_does_not_build_records(session):
+    Item.all().count()
+    assert len(session.identity_map) == 0
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, ForeignKey, Integer, String
+from flaskteroids.model import Model, belongs_to, has_many
+from flaskteroids.rules import rules
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [(PostBase, Post), (CommentBase, Comment)])
+
+
+Base = declarative_base()
+
+
+class PostBase(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    title = Column(String())
+    comments_count = Column(Integer(), default=0, nullable=False)
+
+
+class CommentBase(Base):
+    __tablename__ = 'comments'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    content = Column(String())
+    post_id = Column(Integer(), ForeignKey('posts.id'), nullable=False)
+
+
+@rules(
+    has_many('comments')
+)
+class Post(Model):
+    pass
+
+
+@rules(
+    belongs_to('post', counter_cache=True)
+)
+class Comment(Model):
+    pass
+
+
+def test_create_increments_counter():
+    post = Post.create(title='one')
+    Comment.create(content='first', post=post)
+    Comment.create(content='second', post=post)
+    assert post.comments_count == 2
+    assert Post.find(post.id).comments_count == 2
+
+
+def test_relation_create_increments_counter():
+    post = Post.create(title='one')
+    post.comments.create(content='first')
+    assert post.comments_count == 1
+
+
+def test_destroy_decrements_counter():
+    post = Post.create(title='one')
+    comment = Comment.create(content='first', post=post)
+    comment.destroy()
+    assert post.comments_count == 0
+
+
+def test_moving_record_updates_both_counters():
+    one = Post.create(title='one')
+    two = Post.create(title='two')
+    comment = Comment.create(content='first', post=one)
+    comment.post = two
+    comment.save()
+    assert (one.comments_count, two.comments_count) == (0, 1)
+
+
+def test_update_keeps_counter():
+    post = Post.create(title='one')
+    comment = Comment.create(content='first', post=post)
+    comment.content = 'edited'
+    comment.save()
+    assert post.comments_count == 1
+
+
+def test_len_reads_counter(statements):
+    post = Post.create(title='one')
+    Comment.create(content='first', post=post)
+    post = Post.find(post.id)
+    statements.clear()
+    assert len(post.comments) == 1
+    assert post.comments
+    assert statements == []
+
+
+def test_reset_counters(session):
+    post = Post.create(title='one')
+    Comment.insert_all([{'content': 'first', 'post_id': post.id}, {'content': 'second', 'post_id': post.id}])
+    assert post.comments_count == 0
+    Post.reset_counters()
+    session.refresh(post._base_instance)
+    assert post.comments_count == 2
@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base
+from flaskteroids.exceptions import ProgrammerError
+from flaskteroids.model import Model, belongs_to, has_many
+from flaskteroids.rules import rules
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [(AuthorBase, Author), (PostBase, Post), (CommentBase, Comment)])
+
+
+@pytest.fixture(autouse=True)
+def posts(init, session):
+    authors = [Author.create(name=f'author-{i}') for i in range(2)]
+    for i in range(3):
+        post = Post.create(title=f'post-{i}', author=authors[i % 2])
+        for j in range(2):
+            Comment.create(content=f'comment-{i}-{j}', post=post, author=authors[j])
+    session.expunge_all()
+
+
+Base = declarative_base()
+
+
+class AuthorBase(Base):
+    __tablename__ = 'authors'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    name = Column(String())
+
+
+class PostBase(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    title = Column(String())
+    author_id = Column(Integer(), ForeignKey('authors.id'), nullable=False)
+
+
+class CommentBase(Base):
+    __tablename__ = 'comments'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    content = Column(String())
+    post_id = Column(Integer(), ForeignKey('posts.id'), nullable=False)
+    author_id = Column(Integer(), ForeignKey('authors.id'), nullable=False)
+
+
+class Author(Model):
+    pass
+
+
+@rules(
+    belongs_to('author'),
+    has_many('comments')
+)
+class Post(Model):
+    pass
+
+
+@rules(
+    belongs_to('post'),
+    belongs_to('author')
+)
+class Comment(Model):
+    pass
+
+
+def _read(posts):
+    return [(p.author.name, [(c.content, c.author.name) for c in p.comments]) for p in posts]
+
+
+def test_nested_includes(statements):
+    posts = list(Post.includes('author', comments=['author']))
+    _read(posts)
+    assert len(statements) == 4
+
+
+def test_nested_includes_with_dicts(statements):
+    posts = list(Post.includes({'comments': 'author'}))
+    assert [c.author.name for c in posts[0].comments] == ['author-0', 'author-1']
+    assert len(statements) == 3
+
+
+def test_eager_load_joins_belongs_to(statements):
+    posts = list(Post.eager_load('author', comments='author'))
+    _read(posts)
+    assert len(statements) == 2
+    assert 'JOIN authors' in statements[0]
+
+
+def test_preload(statements):
+    posts = list(Post.preload('author', comments=['author'], chunk_size=2))
+    assert _read(posts) == [
+        ('author-0', [('comment-0-0', 'author-0'), ('comment-0-1', 'author-1')]),
+        ('author-1', [('comment-1-0', 'author-0'), ('comment-1-1', 'author-1')]),
+        ('author-0', [('comment-2-0', 'author-0'), ('comment-2-1', 'author-1')]),
+    ]
+    # posts, authors (2 keys), comments (3 keys in chunks of 2), comment authors
+    assert len(statements) == 5
+
+
+def test_preload_first():
+    post = Post.preload('comments').where(title='post-1').first()
+    assert [c.content for c in post.comments] == ['comment-1-0', 'comment-1-1']
+
+
+def test_preload_in_batches():
+    batches = list(Post.preload('author').find_in_batches(batch_size=2))
+    assert [p.author.name for b in batches for p in b] == ['author-0', 'author-1', 'author-0']
+
+
+def test_unknown_association():
+    with pytest.raises(ProgrammerError):
+        Post.includes('title')
@@ -133,3 +133,38 @@ class TestModelValidations:
         product = Product.new(**{field: valid_value})
         assert product.save()
         assert product.errors.count == 0
+
+
+class TestModelAttributes:
+
+    def test_column_values_are_coerced(self):
+        user = User.new(username='one', age='30')
+        assert user.age == 30
+
+    def test_column_coercion_is_resolved_on_init(self, mocker):
+        from_column_type = mocker.patch('flaskteroids.model.fields.from_column_type')
+        user = User.new(username='one', age='30')
+        user.username = 'two'
+        assert user.username == 'two'
+        from_column_type.assert_not_called()
+
+    def test_persisted_values(self):
+        user = User.create(username='one', age=30)
+        user = User.find(user.id)
+        assert user.username == 'one'
+        assert user.age == 30
+
+    def test_models_have_no_instance_dict(self):
+        user = User.new(username='one')
+        with pytest.raises(AttributeError):
+            object.__getattribute__(user, '__dict__')
+
+    def test_loaded_rows_share_empty_state(self):
+        User.create(username='one')
+        User.create(username='two')
+        one, two = User.all()
+        assert one._changes is two._changes
+        one.username = 'changed'
+        assert one.username == 'changed'
+        assert two.username == 'two'
+        assert not two._changes
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, Integer, String
+from flaskteroids.exceptions import ProgrammerError
+from flaskteroids.model import Model
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [
+        (ItemBase, Item),
+    ])
+
+
+@pytest.fixture(autouse=True)
+def items(init):
+    Item.insert_all([{'name': f'item-{i}', 'quantity': i} for i in range(5)])
+
+
+Base = declarative_base()
+
+
+class ItemBase(Base):
+    __tablename__ = 'items'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    name = Column(String())
+    quantity = Column(Integer())
+
+
+class Item(Model):
+    pass
+
+
+def test_select_loads_only_given_columns():
+    items = list(Item.select('name').order(id='asc'))
+    assert [i.__json__() for i in items[:2]] == [{'id': 1, 'name': 'item-0'}, {'id': 2, 'name': 'item-1'}]
+    assert items[0].quantity == 0
+
+
+def test_pluck_single_column():
+    assert Item.pluck('name') == [f'item-{i}' for i in range(5)]
+
+
+def test_pluck_multiple_columns():
+    assert Item.where(Item.quantity > 2).order(quantity='desc').pluck('id', 'name') == [
+        (5, 'item-4'),
+        (4, 'item-3'),
+    ]
+
+
+def test_pluck_does_not_build_records(session):
+    Item.pluck('id', 'name')
+    assert len(session.identity_map) == 0
+
+
+def test_pick():
+    assert Item.where(quantity=3).pick('name') == 'item-3'
+    assert Item.all().order(id='desc').pick('id', 'quantity') == (5, 4)
+    assert Item.where(quantity=10).pick('name') is None
+
+
+def test_ids():
+    assert Item.where(Item.quantity < 2).ids() == [1, 2]
+
+
+def test_unknown_columns():
+    with pytest.raises(ProgrammerError):
+        Item.pluck('name', 'missing')
@@ -0,0 +1,143 @@
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String, select
+from sqlalchemy.orm import declarative_base
+from flaskteroids.model import Model, belongs_to, has_many, StrictLoadingViolationError
+from flaskteroids.rules import rules
+
+pytestmark = pytest.mark.usefixtures('cache')
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [(PostBase, Post), (CommentBase, Comment)])
+
+
+@pytest.fixture(autouse=True)
+def posts(init, session):
+    for i in range(3):
+        post = Post.create(title=f'post-{i}', views=i)
+        Comment.create(content=f'comment-{i}', post=post)
+    session.expunge_all()
+
+
+Base = declarative_base()
+
+
+class PostBase(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    title = Column(String())
+    views = Column(Integer())
+
+
+class CommentBase(Base):
+    __tablename__ = 'comments'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    content = Column(String())
+    post_id = Column(Integer(), ForeignKey('posts.id'), nullable=False)
+
+
+@rules(
+    has_many('comments', dependent='destroy')
+)
+class Post(Model):
+    pass
+
+
+@rules(
+    belongs_to('post')
+)
+class Comment(Model):
+    pass
+
+
+def _popular():
+    return Post.where(Post.views > 0).order(views='desc').cache(ttl=60)
+
+
+def test_records_are_cached(session, statements):
+    assert [p.title for p in _popular()] == ['post-2', 'post-1']
+    session.expunge_all()
+    posts = list(_popular())
+    assert [(p.title, p.views) for p in posts] == [('post-2', 2), ('post-1', 1)]
+    assert posts[0].is_persisted()
+    assert len(statements) == 1
+
+
+def test_values_are_cached(statements):
+    assert _popular().count() == 2
+    assert _popular().count() == 2
+    assert _popular().pluck('title') == ['post-2', 'post-1']
+    assert _popular().pluck('title') == ['post-2', 'post-1']
+    assert len(statements) == 2
+
+
+def test_writes_invalidate_cached_queries(session):
+    list(_popular())
+    post = Post.find_by(title='post-0')
+    post.views = 10
+    post.save()
+    assert [p.title for p in _popular()] == ['post-0', 'post-2', 'post-1']
+    Post.where(title='post-1').update_all(views=0)
+    assert _popular().count() == 2
+    Post.insert_all([{'title': 'post-3', 'views': 3}])
+    assert _popular().pluck('title') == ['post-0', 'post-3', 'post-2']
+
+
+def test_writes_to_other_tables_keep_cached_queries(statements):
+    list(_popular())
+    Comment.create(content='another', post=Post.find_by(title='post-1'))
+    statements.clear()
+    list(_popular())
+    assert statements == []
+
+
+def test_records_created_through_associations_invalidate(session):
+    post = Post.find_by(title='post-0')
+    comments = Comment.where(post_id=post.id).cache(ttl=60)
+    assert comments.count() == 1
+    post.comments.create(content='another')
+    assert comments.count() == 2
+
+
+def test_queries_reading_several_tables(session):
+    with_comments = Post.where(Post.id.in_(select(CommentBase.post_id))).cache()
+    assert with_comments.count() == 3
+    Comment.find(1).destroy()
+    assert with_comments.count() == 2
+
+
+def test_cascading_deletes_invalidate(session):
+    comments = Comment.all().cache()
+    assert comments.count() == 3
+    Post.find(1).destroy()
+    assert comments.count() == 2
+
+
+def test_preloads_apply_to_cached_records(session):
+    list(Post.all().cache())
+    session.expunge_all()
+    posts = list(Post.all().cache().preload('comments'))
+    assert [c.content for c in posts[0].comments] == ['comment-0']
+
+
+def test_includes_apply_to_cached_records(session, statements):
+    list(Post.all().order(id='asc').cache())
+    for _ in range(2):
+        session.expunge_all()
+        posts = list(Post.includes('comments').strict_loading().order(id='asc').limit(2).offset(1).cache())
+        assert [[c.content for c in p.comments] for p in posts] == [['comment-1'], ['comment-2']]
+    with pytest.raises(StrictLoadingViolationError):
+        list(list(Post.all().strict_loading().cache())[0].comments)
+
+
+def test_cached_selected_columns_are_not_loaded(session, statements):
+    assert [p.title for p in Post.select('title').cache()] == ['post-0', 'post-1', 'post-2']
+    assert len(statements) == 1
+    session.expunge_all()
+    posts = list(Post.select('title').cache())
+    assert [p.title for p in posts] == ['post-0', 'post-1', 'post-2']
+    assert len(statements) == 1
+    assert posts[0].views == 0
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, Integer, String
+from flaskteroids.exceptions import ProgrammerError
+from flaskteroids.model import Model, RecordNotFoundException, cache_records, _record_key
+from flaskteroids.rules import rules
+
+pytestmark = pytest.mark.usefixtures('cache')
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [(PlanBase, Plan), (ItemBase, Item)])
+
+
+@pytest.fixture
+def plan(init, session):
+    plan = Plan.create(name='basic', price=10)
+    session.expunge_all()
+    return plan
+
+
+Base = declarative_base()
+
+
+class PlanBase(Base):
+    __tablename__ = 'plans'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    name = Column(String(), unique=True)
+    price = Column(Integer())
+
+
+class ItemBase(Base):
+    __tablename__ = 'items'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    name = Column(String())
+
+
+@rules(
+    cache_records(ttl=60)
+)
+class Plan(Model):
+    pass
+
+
+class Item(Model):
+    pass
+
+
+def test_find_is_served_from_cache(plan, session, statements):
+    assert Plan.find(plan.id).name == 'basic'
+    session.expunge_all()
+    found = Plan.find(plan.id)
+    assert (found.name, found.price) == ('basic', 10)
+    assert len(statements) == 1
+
+
+def test_cached_records_can_be_saved(plan, session):
+    Plan.find(plan.id)
+    session.expunge_all()
+    found = Plan.find(plan.id)
+    assert found.is_persisted()
+    found.price = 20
+    assert found.save()
+    session.expunge_all()
+    assert Plan.find(plan.id).price == 20
+
+
+def test_find_by_id_is_served_from_cache(plan, session, statements):
+    Plan.find_by(id=plan.id)
+    session.expunge_all()
+    assert Plan.find_by(id=plan.id).name == 'basic'
+    assert Plan.find_by(id=100) is None
+    assert len(statements) == 2
+
+
+def test_missing_records_raise(init):
+    with pytest.raises(RecordNotFoundException):
+        Plan.cached_find(100)
+
+
+def test_destroy_deletes_entry(plan, session, cache):
+    Plan.find(plan.id).destroy()
+    with pytest.raises(RecordNotFoundException):
+        Plan.find(plan.id)
+
+
+def test_bulk_writes_delete_entries(plan, session):
+    Plan.find(plan.id)
+    Plan.where(id=plan.id).update_all(price=30)
+    session.expunge_all()
+    assert Plan.find(plan.id).price == 30
+
+
+def test_upserts_by_other_columns_make_entries_stale(plan, session):
+    Plan.find(plan.id)
+    Plan.upsert_all([{'name': 'basic', 'price': 99}], unique_by='name')
+    session.expunge_all()
+    assert Plan.find(plan.id).price == 99
+
+
+def test_entries_stored_before_a_write_are_not_served(plan, session, cache):
+    # Someone read the record before the write was committed and stored it afterwards
+    cache.store(_record_key(Plan, plan.id), {'id': plan.id, 'name': 'basic', 'price': 1})
+    Plan.create(name='premium', price=50)
+    assert Plan.find(plan.id).price == 10
+
+
+def test_models_without_rule(init):
+    item = Item.create(name='one')
+    assert Item.find(item.id)
+    with pytest.raises(ProgrammerError):
+        Item.cached_find(item.id)
@@ -0,0 +1,119 @@
+import logging
+import pytest
+from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, ForeignKey, Integer, String
+from flaskteroids.model import Model, StrictLoadingViolationError, belongs_to, has_many, strict_loading
+from flaskteroids.rules import rules
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [(PostBase, Post), (CommentBase, Comment), (TagBase, Tag)])
+
+
+@pytest.fixture(autouse=True)
+def post(init):
+    post = Post.create(title='one')
+    Comment.create(content='first', post=post)
+    Tag.create(name='news', post=post)
+    return post
+
+
+Base = declarative_base()
+
+
+class PostBase(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    title = Column(String())
+
+
+class CommentBase(Base):
+    __tablename__ = 'comments'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    content = Column(String())
+    post_id = Column(Integer(), ForeignKey('posts.id'), nullable=False)
+
+
+class TagBase(Base):
+    __tablename__ = 'tags'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    name = Column(String())
+    post_id = Column(Integer(), ForeignKey('posts.id'), nullable=False)
+
+
+@rules(
+    has_many('comments')
+)
+class Post(Model):
+    pass
+
+
+@rules(
+    belongs_to('post'),
+    strict_loading()
+)
+class Comment(Model):
+    pass
+
+
+@rules(
+    belongs_to('post')
+)
+class Tag(Model):
+    pass
+
+
+@pytest.fixture
+def fresh(session):
+    session.expunge_all()
+
+
+@pytest.mark.usefixtures('fresh')
+def test_lazy_loads_are_allowed_by_default():
+    assert [c.content for c in Post.all().first().comments] == ['first']
+
+
+@pytest.mark.usefixtures('fresh')
+def test_query_strict_loading():
+    post = Post.strict_loading().first()
+    with pytest.raises(StrictLoadingViolationError):
+        list(post.comments)
+
+
+@pytest.mark.usefixtures('fresh')
+def test_query_strict_loading_allows_included_associations():
+    post = Post.includes('comments').strict_loading().first()
+    assert [c.content for c in post.comments] == ['first']
+
+
+@pytest.mark.usefixtures('fresh')
+def test_model_strict_loading():
+    comment = Comment.all().first()
+    with pytest.raises(StrictLoadingViolationError):
+        comment.post
+
+
+@pytest.mark.usefixtures('fresh')
+def test_query_overrides_model_strict_loading():
+    comment = Comment.strict_loading(False).first()
+    assert comment.post.title == 'one'
+
+
+@pytest.mark.usefixtures('fresh')
+def test_strict_loading_log_mode(caplog):
+    post = Post.all().strict_loading('log').first()
+    with caplog.at_level(logging.WARNING):
+        assert len(list(post.comments)) == 1
+    assert 'Post#comments was lazily loaded' in caplog.text
+
+
+@pytest.mark.usefixtures('fresh')
+def test_app_strict_loading(current_app):
+    current_app.config['DB'] = {'STRICT_LOADING': True}
+    with pytest.raises(StrictLoadingViolationError):
+        Tag.all().first().post
+    assert Comment.strict_loading(False).first().post
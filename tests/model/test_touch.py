@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from flaskteroids.model import Model, belongs_to, has_many
+from flaskteroids.rules import rules
+
+
+@pytest.fixture(autouse=True)
+def init(init_models):
+    init_models(Base, [(BoardBase, Board), (PostBase, Post), (CommentBase, Comment)])
+
+
+Base = declarative_base()
+
+
+class BoardBase(Base):
+    __tablename__ = 'boards'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    name = Column(String())
+    created_at = Column(DateTime())
+    updated_at = Column(DateTime())
+
+
+class PostBase(Base):
+    __tablename__ = 'posts'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    title = Column(String())
+    board_id = Column(Integer(), ForeignKey('boards.id'), nullable=False)
+    created_at = Column(DateTime())
+    updated_at = Column(DateTime())
+
+
+class CommentBase(Base):
+    __tablename__ = 'comments'
+
+    id = Column(Integer(), primary_key=True, autoincrement=True)
+    content = Column(String())
+    post_id = Column(Integer(), ForeignKey('posts.id'), nullable=False)
+    created_at = Column(DateTime())
+    updated_at = Column(DateTime())
+
+
+@rules(
+    has_many('posts')
+)
+class Board(Model):
+    pass
+
+
+@rules(
+    belongs_to('board', touch=True),
+    has_many('comments')
+)
+class Post(Model):
+    pass
+
+
+@rules(
+    belongs_to('post', touch=True)
+)
+class Comment(Model):
+    pass
+
+
+@pytest.fixture
+def board(init):
+    return Board.create(name='news')
+
+
+@pytest.fixture
+def post(board):
+    return Post.create(title='one', board=board)
+
+
+def test_cache_key(board):
+    assert board.cache_key == f'boards/{board.id}'
+    assert Board.new(name='draft').cache_key == 'boards/new'
+
+
+def test_cache_version_changes_on_save(board):
+    version = board.cache_version
+    assert version
+    board.name = 'renamed'
+    board.save()
+    assert board.cache_version != version
+
+
+def test_cache_version_without_updated_at(board):
+    assert Board.new(name='draft').cache_version is None
+
+
+def test_touch(board):
+    version = board.cache_version
+    board.touch()
+    assert board.cache_version != version
+
+
+def test_saving_touches_parents(board, post):
+    versions = (board.cache_version, post.cache_version)
+    Comment.create(content='first', post=post)
+    assert post.cache_version != versions[1]
+    assert board.cache_version != versions[0]
+
+
+def test_destroying_touches_parents(post):
+    comment = Comment.create(content='first', post=post)
+    version = post.cache_version
+    comment.destroy()
+    assert post.cache_version != version
+
+
+def test_moving_touches_both_parents(board):
+    one = Post.create(title='one', board=board)
+    two = Post.create(title='two', board=board)
+    comment = Comment.create(content='first', post=one)
+    versions = (one.cache_version, two.cache_version)
+    comment.post = two
+    comment.save()
+    assert one.cache_version != versions[0]
+    assert two.cache_version != versions[1]
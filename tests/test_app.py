@@ -51,3 +51,22 @@ def _extract_csrf_token(res):
     if not match:
         return ""
     return match.group(1)
+
+
+def test_users_export_streams_json(client):
+    res = client.get('/users/new/')
+    csrf_token = _extract_csrf_token(res)
+    for username in ['one', 'two']:
+        client.post('/users/', data={'csrf_token': csrf_token, 'user.username': username})
+    res = client.get('/users/export/')
+    assert res.status_code == HTTPStatus.OK
+    assert res.is_streamed
+    assert res.mimetype == 'application/json'
+    assert [u['username'] for u in res.json][-2:] == ['one', 'two']
+
+
+def test_templates_can_cache_fragments(app):
+    with app.app_context():
+        template = app.jinja_env.from_string("{% cache 'fragment' %}{{ value }}{% endcache %}")
+        assert template.render(value='first') == 'first'
+        assert template.render(value='second') == 'first'
@@ -0,0 +1,125 @@
+import logging
+import pytest
+from flask import Flask, g
+from sqlalchemy import create_engine, text
+import flaskteroids.registry as registry
+from flaskteroids.cache import MISSING
+from flaskteroids.db import enable_query_cache, table_version, touched_tables
+from flaskteroids.extensions.db import _detect_n_plus_one
+from flaskteroids.model import _record_key
+from tests.app.models.user import User
+
+
+@pytest.fixture
+def engine():
+    return create_engine('sqlite:///:memory:')
+
+
+@pytest.fixture
+def detector_app(engine):
+    app = Flask(__name__)
+    _detect_n_plus_one(app, engine)
+
+    @app.route('/<int:times>')
+    def _(times):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            for i in range(times):
+                conn.execute(text('SELECT :i'), {'i': i})
+        return ''
+
+    return app
+
+
+def test_reports_repeated_statements(detector_app, caplog):
+    with caplog.at_level(logging.WARNING):
+        detector_app.test_client().get('/3')
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert 'ran 3 times' in message
+    assert 'SELECT ?' in message
+    assert __file__ in message
+
+
+def test_ignores_statements_below_threshold(detector_app, caplog):
+    with caplog.at_level(logging.WARNING):
+        detector_app.test_client().get('/2')
+    assert not caplog.records
+
+
+@pytest.fixture
+def query_cache(app_ctx):
+    enable_query_cache()
+    return g.db_query_cache
+
+
+@pytest.fixture
+def user(app_ctx):
+    return User.create(username='cached')
+
+
+def test_query_cache_serves_repeated_selects(query_cache, user):
+    assert User.find(user.id) is not None
+    assert User.find(user.id) is not None
+    assert User.where(username='cached').count() == 1
+    assert User.where(username='cached').count() == 1
+    assert (query_cache.hits, query_cache.misses) == (2, 2)
+
+
+def test_query_cache_keys_on_params(query_cache, user):
+    other = User.create(username='other')
+    assert User.find(user.id).username == 'cached'
+    assert User.find(other.id).username == 'other'
+    assert query_cache.hits == 0
+
+
+def test_query_cache_is_cleared_on_writes(query_cache, user):
+    assert User.where(username='renamed').count() == 0
+    user.username = 'renamed'
+    user.save()
+    assert User.where(username='renamed').count() == 1
+    User.where(username='renamed').update_all(username='again')
+    assert User.where(username='renamed').count() == 0
+    assert query_cache.hits == 0
+
+
+def test_query_cache_is_dropped_with_the_session(app):
+    with app.app_context():
+        enable_query_cache()
+    with app.app_context():
+        assert 'db_query_cache' not in g
+
+
+@pytest.fixture
+def cached_users(app):
+    registry.get(User)['cache_records'] = {'ttl': None}
+    yield app.extensions['flaskteroids.cache'].cache
+    registry.get(User).pop('cache_records')
+
+
+def test_cached_records_are_deleted_after_the_transaction(app, cached_users):
+    with app.app_context():
+        user_id = User.create(username='before').id
+    with app.app_context():
+        User.find(user_id)
+        key = _record_key(User, user_id)
+    assert cached_users.fetch(key)['username'] == 'before'
+    with app.app_context():
+        user = User.find(user_id)
+        user.username = 'after'
+        user.save()
+        assert User.find(user_id).username == 'after'
+        assert cached_users.fetch(key)['username'] == 'before'
+    assert cached_users.fetch(key) is MISSING
+    with app.app_context():
+        assert User.find(user_id).username == 'after'
+
+
+def test_table_versions_change_after_the_transaction(app):
+    with app.app_context():
+        version = table_version('users')
+        User.create(username='versioned')
+        assert 'users' in touched_tables()
+        assert table_version('users') == version
+    with app.app_context():
+        assert table_version('users') != version
@@ -0,0 +1,43 @@
+import gc
+import weakref
+import pytest
+from flaskteroids import registry
+
+
+def _make_class():
+    class Same:
+        pass
+    return Same
+
+
+def test_classes_with_same_qualname_do_not_share_namespace():
+    one, two = _make_class(), _make_class()
+    registry.get(one)['value'] = 1
+    assert 'value' not in registry.get(two)
+
+
+def test_compiled_is_read_only():
+    cls = _make_class()
+    registry.get(cls)['entries'] = [1, 2]
+    view = registry.compiled(cls)
+    assert view['entries'] == (1, 2)
+    with pytest.raises(TypeError):
+        view['entries'] = []
+
+
+def test_compiled_is_refreshed_after_get():
+    cls = _make_class()
+    registry.get(cls)['value'] = 1
+    assert registry.compiled(cls)['value'] == 1
+    registry.get(cls)['value'] = 2
+    assert registry.compiled(cls)['value'] == 2
+
+
+def test_registry_does_not_keep_classes_alive():
+    cls = _make_class()
+    registry.get(cls)['value'] = 1
+    registry.compiled(cls)
+    ref = weakref.ref(cls)
+    del cls
+    gc.collect()
+    assert ref() is None